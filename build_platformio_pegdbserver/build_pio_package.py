@@ -10,21 +10,246 @@ import argparse
 import os
 import shutil
 import subprocess
+import struct
 import sys
 import json
+import zipfile
+import zlib
 import hashlib
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from pathlib import Path
 from typing import Dict, List, Optional
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ISA-L deflate is several times faster than zlib at the same low level and
+# produces standard raw deflate streams; zlib is used when it is missing
+try:
+    from isal import isal_zlib as deflate_zlib
+except ImportError:
+    deflate_zlib = zlib
+
 logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 logger = logging.getLogger(__name__)
 
+# Read size used when hashing archives
+HASH_CHUNK_SIZE = 1 << 20
+
+# DEFLATE level for archive entries; higher levels gain little on this payload
+ZIP_COMPRESSLEVEL = 1
+
+# Binary payloads that barely compress and are stored as-is
+STORED_SUFFIXES = {".so", ".pcp"}
+
+
+def _fast_copy(src, dst):
+    """
+    Copy a file and its metadata, keeping the data in kernel space.
+
+    Drop-in replacement for ``shutil.copy2`` (including as a ``copytree``
+    ``copy_function``). Uses ``os.copy_file_range`` where the platform
+    provides it and falls back to ``shutil.copyfile`` otherwise.
+    """
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    # Replace rather than truncate: dst may be a hardlink to src left by a
+    # --hardlink build, and truncating it would empty the source too
+    if os.path.lexists(dst):
+        os.unlink(dst)
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            remaining = os.fstat(fsrc.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+    except (AttributeError, OSError):
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+    return dst
+
+
+def _link_or_copy(src, dst):
+    """
+    Hardlink a file into place, falling back to ``_fast_copy``.
+
+    Same call signature as ``shutil.copy2``. An existing destination is
+    replaced so repeated builds do not fail on ``FileExistsError``.
+    """
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    try:
+        if os.path.lexists(dst):
+            os.unlink(dst)
+        os.link(src, dst)
+    except OSError:
+        return _fast_copy(src, dst)
+    return dst
+
+
+def _dump_json(data) -> bytes:
+    """Serialize a manifest as 2-space indented JSON, using orjson if installed."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(data, indent=2) + "\n").encode("utf-8")
+
+
+def _dos_date_time(zinfo):
+    """Timestamp of a ``ZipInfo`` at the 2-second resolution zip stores."""
+    return zinfo.date_time[:5] + (zinfo.date_time[5] // 2,)
+
+
+def _compress_entry(path, arcname, previous=None):
+    """
+    Read and compress one file for the package archive.
+
+    Returns a ``ZipInfo`` with CRC and sizes filled in, plus the raw
+    (already compressed) member data. If ``previous`` (arcname to
+    ``ZipInfo`` from an earlier archive) holds an entry with the same
+    timestamp, size and compression, that entry is returned with a
+    payload of None so the caller can copy it over unchanged.
+    """
+    zinfo = zipfile.ZipInfo.from_file(path, arcname)
+    stored = os.path.splitext(path)[1].lower() in STORED_SUFFIXES
+    compress_type = zipfile.ZIP_STORED if stored else zipfile.ZIP_DEFLATED
+    
+    old = previous.get(arcname) if previous else None
+    if (old is not None
+            and _dos_date_time(old) == _dos_date_time(zinfo)
+            and old.file_size == zinfo.file_size
+            and old.compress_type == compress_type
+            and not old.flag_bits & 0x08):  # no trailing data descriptor
+        return old, None
+    
+    with open(path, 'rb') as f:
+        data = f.read()
+    zinfo.file_size = len(data)
+    zinfo.CRC = zlib.crc32(data)
+    zinfo.compress_type = compress_type
+    if stored:
+        payload = data
+    else:
+        compressor = deflate_zlib.compressobj(ZIP_COMPRESSLEVEL, deflate_zlib.DEFLATED, -15)
+        payload = compressor.compress(data) + compressor.flush()
+    zinfo.compress_size = len(payload)
+    return zinfo, payload
+
+
+def _read_raw_member(zf, zinfo):
+    """Return the still-compressed data of a member of an open archive."""
+    zf.fp.seek(zinfo.header_offset)
+    header = zf.fp.read(zipfile.sizeFileHeader)
+    if header[:4] != b"PK\x03\x04":
+        raise zipfile.BadZipFile(f"Bad local header for {zinfo.filename}")
+    name_len, extra_len = struct.unpack("<HH", header[26:30])
+    zf.fp.seek(name_len + extra_len, os.SEEK_CUR)
+    return zf.fp.read(zinfo.compress_size)
+
+
+# ZipFile internals used to copy and append pre-compressed members. They are
+# checked on every archive, so an interpreter that changes them falls back to
+# the public API instead of corrupting the archive
+_RAW_MEMBER_ATTRS = ("_lock", "_writecheck", "_didModify", "start_dir", "fp")
+
+
+def _raw_members_supported(zf):
+    """Whether ``zf`` exposes the internals raw member access relies on."""
+    return all(hasattr(zf, attr) for attr in _RAW_MEMBER_ATTRS)
+
+
+def _write_compressed(zf, zinfo, payload):
+    """
+    Append a member produced by ``_compress_entry`` to an open archive.
+
+    ``ZipFile`` has no public API for pre-compressed data, so this mirrors
+    the bookkeeping ``ZipFile.mkdir`` does for directory entries. Without
+    those internals the payload is inflated again and written through
+    ``ZipFile.writestr``, which recompresses it.
+    """
+    if not _raw_members_supported(zf):
+        if zinfo.compress_type == zipfile.ZIP_DEFLATED:
+            payload = zlib.decompress(payload, -15)
+        zf.writestr(zinfo, payload, compresslevel=ZIP_COMPRESSLEVEL)
+        return
+    with zf._lock:
+        zf.fp.seek(zf.start_dir)
+        zinfo.header_offset = zf.fp.tell()
+        zf._writecheck(zinfo)
+        zf._didModify = True
+        zf.fp.write(zinfo.FileHeader())
+        zf.fp.write(payload)
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[zinfo.filename] = zinfo
+        zf.start_dir = zf.fp.tell()
+
+
+def _bounded_map(pool, fn, items, window):
+    """
+    Like ``pool.map(fn, items)``, but with at most ``window`` calls in flight.
+
+    Results are yielded in order; the next item is only submitted once the
+    oldest result has been taken, so finished but unconsumed results never
+    pile up in memory.
+    """
+    pending = deque()
+    for item in items:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(pool.submit(fn, item))
+    while pending:
+        yield pending.popleft().result()
+
+
+class _HashingWriter:
+    """
+    Binary file wrapper that computes a SHA-256 of the data written to it.
+
+    ``ZipFile`` in write mode only appends, so the digest matches the file
+    on disk. Seeking anywhere but the current end invalidates the digest
+    and ``hexdigest`` returns None, leaving the caller to re-read the file.
+    """
+    
+    def __init__(self, fileobj):
+        self._fileobj = fileobj
+        self._hash = hashlib.sha256()
+        self._pos = fileobj.tell()
+        self._valid = self._pos == 0
+    
+    def write(self, data):
+        written = self._fileobj.write(data)
+        if self._valid:
+            self._hash.update(data)
+        self._pos += written
+        return written
+    
+    def tell(self):
+        return self._pos
+    
+    def seek(self, offset, whence=os.SEEK_SET):
+        pos = self._fileobj.seek(offset, whence)
+        if pos != self._pos:
+            self._valid = False
+        self._pos = pos
+        return pos
+    
+    def flush(self):
+        self._fileobj.flush()
+    
+    def hexdigest(self) -> Optional[str]:
+        return self._hash.hexdigest() if self._valid else None
+
 
 class PIOPackageBuilder:
     """Build PlatformIO package from S32DS installation."""
     
-    def __init__(self, s32ds_root: Path, output_dir: Path = None):
+    def __init__(self, s32ds_root: Path, output_dir: Path = None, hardlink: bool = False):
         """
         Initialize package builder.
         
@@ -34,20 +259,53 @@ class PIOPackageBuilder:
             Root directory of S32 Design Studio installation
         output_dir : Path, optional
             Output directory for package (default: s32ds_root/platformio_package)
+        hardlink : bool, optional
+            Hardlink support files into the package instead of copying them
+            when source and output share a filesystem (default: False)
         """
-        self.s32ds_root = Path(s32ds_root).resolve()
+        self.hardlink = hardlink
+        self._root_str = os.path.realpath(s32ds_root)
+        self.s32ds_root = Path(self._root_str)
         self.output_dir = output_dir or (self.s32ds_root / "platformio_package")
         
-        # Source paths
-        self.server_plugin = self.s32ds_root / "plugins" / "com.pemicro.debug.gdbjtag.ppc_1.7.2.201709281658"
-        self.server_binary = self.server_plugin / "lin" / "pegdbserver_power_console"
-        self.gdi_dir = self.server_plugin / "lin" / "gdi"
-        self.pemicro_dir = self.gdi_dir / "P&E"
+        # Source paths as plain strings; Path objects are built on first use
+        self._server_plugin_str = os.path.join(
+            self._root_str, "plugins", "com.pemicro.debug.gdbjtag.ppc_1.7.2.201709281658"
+        )
+        self._gdi_dir_str = os.path.join(self._server_plugin_str, "lin", "gdi")
         
         # Package structure
         self.package_name = "tool-pegdbserver-power"
         self.package_root = self.output_dir / self.package_name
         
+        # Destination directories inside the package, joined once
+        self.package_bin_dir = self.package_root / "tools" / "pegdbserver" / "bin"
+        self.package_gdi_dir = self.package_root / "tools" / "pegdbserver" / "gdi"
+        self.package_pemicro_dir = self.package_gdi_dir / "P&E"
+        
+        # File counts by suffix in the packaged P&E directory, set by copy_files
+        self._pemicro_counts = None
+        
+    @cached_property
+    def server_plugin(self) -> Path:
+        """P&E GDB server plugin directory inside S32DS."""
+        return Path(self._server_plugin_str)
+    
+    @cached_property
+    def server_binary(self) -> Path:
+        """GDB server console executable."""
+        return Path(os.path.join(self._server_plugin_str, "lin", "pegdbserver_power_console"))
+    
+    @cached_property
+    def gdi_dir(self) -> Path:
+        """GDI directory holding device support files."""
+        return Path(self._gdi_dir_str)
+    
+    @cached_property
+    def pemicro_dir(self) -> Path:
+        """P&E device definitions and flash algorithms."""
+        return Path(os.path.join(self._gdi_dir_str, "P&E"))
+    
     def validate_sources(self) -> bool:
         """Validate that all required source files exist."""
         logger.info("Validating source files...")
@@ -74,8 +332,8 @@ class PIOPackageBuilder:
         logger.info("Creating package structure...")
         
         dirs = [
-            self.package_root / "tools" / "pegdbserver" / "bin",
-            self.package_root / "tools" / "pegdbserver" / "gdi" / "P&E",
+            self.package_bin_dir,
+            self.package_pemicro_dir,
         ]
         
         for dir_path in dirs:
@@ -83,47 +341,77 @@ class PIOPackageBuilder:
             
         logger.info(f"✓ Package structure created: {self.package_root}")
     
+    def _count_pemicro_files(self) -> Counter:
+        """Count files in the packaged P&E directory by lowercase suffix."""
+        counts = Counter()
+        if not self.package_pemicro_dir.is_dir():
+            return counts
+        with os.scandir(self.package_pemicro_dir) as it:
+            for entry in it:
+                if entry.is_file(follow_symlinks=False):
+                    counts[os.path.splitext(entry.name)[1].lower()] += 1
+        return counts
+    
+    def _copy_function(self):
+        """Pick hardlinking or copying for support files."""
+        if self.hardlink:
+            src_dev = os.stat(self.gdi_dir).st_dev
+            if src_dev == os.stat(self.package_root).st_dev:
+                logger.info("  Hardlinking files (same filesystem)")
+                return _link_or_copy
+            logger.warning("  Source and output are on different filesystems, copying instead")
+        return _fast_copy
+    
     def copy_files(self):
         """Copy all required files to package."""
         logger.info("Copying files...")
+        copy = self._copy_function()
         
-        # Copy binary
-        binary_dest = self.package_root / "tools" / "pegdbserver" / "bin" / "pegdbserver_power_console"
-        shutil.copy2(self.server_binary, binary_dest)
+        # Copy binary (always a real copy: the chmod below must not
+        # change the S32DS original through a shared inode)
+        binary_dest = self.package_bin_dir / "pegdbserver_power_console"
+        _fast_copy(self.server_binary, binary_dest)
         os.chmod(binary_dest, 0o755)
         logger.info(f"  ✓ Binary: {binary_dest.name}")
         
         # Copy GDI internal library
         gdi_lib = self.gdi_dir / "unit_ngs_ppcnexus_internal.so"
         if gdi_lib.exists():
-            shutil.copy2(gdi_lib, self.package_root / "tools" / "pegdbserver" / "gdi")
+            copy(gdi_lib, self.package_gdi_dir)
             logger.info(f"  ✓ GDI library: {gdi_lib.name}")
         
         # Copy P&E directory contents
-        pemicro_dest = self.package_root / "tools" / "pegdbserver" / "gdi" / "P&E"
+        pemicro_dest = self.package_pemicro_dir
         if self.pemicro_dir.exists():
-            for item in self.pemicro_dir.iterdir():
+            def copy_item(item):
                 if item.is_file():
-                    shutil.copy2(item, pemicro_dest)
+                    copy(item, pemicro_dest)
                 elif item.is_dir():
-                    shutil.copytree(item, pemicro_dest / item.name, dirs_exist_ok=True)
+                    shutil.copytree(item, pemicro_dest / item.name,
+                                    copy_function=copy, dirs_exist_ok=True)
+
+            # Per-file syscall latency dominates, so overlap the copies
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+                list(pool.map(copy_item, self.pemicro_dir.iterdir()))
             
-            # Count files by type
-            add_files = list(pemicro_dest.glob("*.add"))
-            pcp_files = list(pemicro_dest.glob("*.pcp"))
-            so_files = list(pemicro_dest.glob("*.so"))
-            xml_files = list(self.package_root.rglob("*.xml"))
-            mac_files = list(pemicro_dest.glob("*.mac"))
+            # Count files by type; verify_package reuses these counts
+            counts = self._pemicro_counts = self._count_pemicro_files()
+            xml_count = sum(
+                1
+                for _, _, files in os.walk(self.package_root)
+                for name in files
+                if name.lower().endswith(".xml")
+            )
             
-            logger.info(f"  ✓ Device files (.add): {len(add_files)}")
-            logger.info(f"  ✓ Flash algorithms (.pcp): {len(pcp_files)}")
-            logger.info(f"  ✓ Libraries (.so): {len(so_files)}")
-            logger.info(f"  ✓ XML files: {len(xml_files)}")
-            logger.info(f"  ✓ Macro files (.mac): {len(mac_files)}")
+            logger.info(f"  ✓ Device files (.add): {counts['.add']}")
+            logger.info(f"  ✓ Flash algorithms (.pcp): {counts['.pcp']}")
+            logger.info(f"  ✓ Libraries (.so): {counts['.so']}")
+            logger.info(f"  ✓ XML files: {xml_count}")
+            logger.info(f"  ✓ Macro files (.mac): {counts['.mac']}")
         
         # Copy XML files from gdi root
         for xml_file in self.gdi_dir.glob("*.xml"):
-            shutil.copy2(xml_file, self.package_root / "tools" / "pegdbserver" / "gdi")
+            copy(xml_file, self.package_gdi_dir)
     
     def create_package_json(self):
         """Create package.json manifest."""
@@ -153,8 +441,7 @@ class PIOPackageBuilder:
         }
         
         json_path = self.package_root / "package.json"
-        with open(json_path, 'w') as f:
-            json.dump(package_info, f, indent=2)
+        json_path.write_bytes(_dump_json(package_info))
             
         logger.info(f"  ✓ Created: {json_path.name}")
     
@@ -215,11 +502,22 @@ upload_command = $PROJECT_PACKAGES_DIR/tool-pegdbserver-power/bin/pegdbserver_po
 """
         
         readme_path = self.package_root / "README.md"
-        with open(readme_path, 'w') as f:
-            f.write(readme_content)
+        readme_path.write_bytes(readme_content.encode('utf-8'))
             
         logger.info(f"  ✓ Created: {readme_path.name}")
     
+    @staticmethod
+    def _sha256_file(path: Path) -> str:
+        """Hash a file in fixed-size chunks so memory stays bounded."""
+        with open(path, 'rb') as f:
+            # Python 3.11+ hashes in C without per-chunk bytes objects
+            if hasattr(hashlib, "file_digest"):
+                return hashlib.file_digest(f, "sha256").hexdigest()
+            h = hashlib.sha256()
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                h.update(chunk)
+        return h.hexdigest()
+
     def create_archive(self, output_file: Path = None) -> Path:
         """Create zip archive of package."""
         logger.info("Creating archive...")
@@ -227,22 +525,62 @@ upload_command = $PROJECT_PACKAGES_DIR/tool-pegdbserver-power/bin/pegdbserver_po
         if output_file is None:
             output_file = self.output_dir / f"{self.package_name}.zip"
         
-        # Remove existing archive if present
+        # Members of an existing archive are reused when their source file
+        # is unchanged, so only modified files get recompressed
+        previous_zf = None
+        previous = {}
         if output_file.exists():
-            output_file.unlink()
-        
-        # Create archive
-        shutil.make_archive(
-            str(output_file.with_suffix('')),
-            'zip',
-            root_dir=self.package_root.parent,
-            base_dir=self.package_name
-        )
+            try:
+                previous_zf = zipfile.ZipFile(output_file)
+                if _raw_members_supported(previous_zf):
+                    previous = {i.filename: i for i in previous_zf.infolist()}
+            except (OSError, zipfile.BadZipFile):
+                logger.warning(f"  ⚠ Ignoring unreadable archive: {output_file.name}")
+        
+        # Create archive alongside the old one, then swap it into place
+        tmp_file = output_file.with_name(output_file.name + ".tmp")
+        root_dir = self.package_root.parent
+        entries = []
+        reused = 0
+        # A failed build leaves neither a partial .tmp archive nor an open
+        # handle on the previous archive behind
+        try:
+            # The archive is hashed as it is written, saving a second full read
+            with open(tmp_file, 'wb') as raw, \
+                    zipfile.ZipFile(writer := _HashingWriter(raw), 'w',
+                                    compression=zipfile.ZIP_DEFLATED,
+                                    compresslevel=ZIP_COMPRESSLEVEL) as zf:
+                for dirpath, dirnames, filenames in os.walk(self.package_root):
+                    dirnames.sort()
+                    zf.write(dirpath, os.path.relpath(dirpath, root_dir))
+                    for name in sorted(filenames):
+                        path = os.path.join(dirpath, name)
+                        entries.append((path, os.path.relpath(path, root_dir)))
+                
+                # zlib releases the GIL, so entries compress in parallel while
+                # the main thread appends finished ones in order. At most one
+                # compressed payload per worker is held in memory at a time
+                workers = os.cpu_count() or 1
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    for zinfo, payload in _bounded_map(
+                            pool, lambda e: _compress_entry(*e, previous), entries, workers):
+                        if payload is None:
+                            payload = _read_raw_member(previous_zf, zinfo)
+                            reused += 1
+                        _write_compressed(zf, zinfo, payload)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
+        finally:
+            if previous_zf is not None:
+                previous_zf.close()
+        os.replace(tmp_file, output_file)
+        if reused:
+            logger.info(f"  ✓ Reused {reused} unchanged entries from previous archive")
         
         # Calculate size and hash
         size_mb = output_file.stat().st_size / (1024 * 1024)
-        with open(output_file, 'rb') as f:
-            sha256 = hashlib.sha256(f.read()).hexdigest()
+        sha256 = writer.hexdigest() or self._sha256_file(output_file)
         
         logger.info(f"  ✓ Archive created: {output_file.name} ({size_mb:.1f} MB)")
         logger.info(f"  ✓ SHA256: {sha256}")
@@ -260,8 +598,8 @@ upload_command = $PROJECT_PACKAGES_DIR/tool-pegdbserver-power/bin/pegdbserver_po
         logger.info("Verifying package...")
         
         checks = [
-            (self.package_root / "tools" / "pegdbserver" / "bin" / "pegdbserver_power_console", "Binary"),
-            (self.package_root / "tools" / "pegdbserver" / "gdi" / "P&E", "P&E directory"),
+            (self.package_bin_dir / "pegdbserver_power_console", "Binary"),
+            (self.package_pemicro_dir, "P&E directory"),
             (self.package_root / "package.json", "package.json"),
         ]
         
@@ -273,9 +611,12 @@ upload_command = $PROJECT_PACKAGES_DIR/tool-pegdbserver-power/bin/pegdbserver_po
             else:
                 logger.info(f"  ✓ Found: {name}")
         
-        # Check file counts
-        add_files = len(list((self.package_root / "tools" / "pegdbserver" / "gdi" / "P&E").glob("*.add")))
-        pcp_files = len(list((self.package_root / "tools" / "pegdbserver" / "gdi" / "P&E").glob("*.pcp")))
+        # Check file counts (counted during copy_files when it ran)
+        counts = self._pemicro_counts
+        if counts is None:
+            counts = self._count_pemicro_files()
+        add_files = counts['.add']
+        pcp_files = counts['.pcp']
         
         if add_files == 0:
             logger.warning(f"  ⚠ No device files (.add) found")
@@ -351,6 +692,11 @@ def main():
         action='store_true',
         help='Skip creating zip archive'
     )
+    parser.add_argument(
+        '--hardlink',
+        action='store_true',
+        help='Hardlink support files instead of copying when on the same filesystem'
+    )
     parser.add_argument(
         '--verbose',
         action='store_true',
@@ -364,7 +710,8 @@ def main():
     
     builder = PIOPackageBuilder(
         s32ds_root=args.s32ds_root,
-        output_dir=args.output_dir
+        output_dir=args.output_dir,
+        hardlink=args.hardlink
     )
     
     archive = builder.build(create_archive=not args.no_archive)
@@ -0,0 +1,159 @@
+# Copyright 2014-present PlatformIO <contact@platformio.org>
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Shared FreeRTOS setup
+
+Used by the FreeRTOS and Arduino framework builders. SCons puts the
+SConscript directory on sys.path, so builders import this module directly.
+Directory probes and environment setup run once per build.
+"""
+
+from functools import lru_cache
+from os.path import isdir, join, relpath
+import os
+
+# FreeRTOS port used for PowerPC VLE targets
+PORT_NAME = "PowerPC"
+
+# Platform warning flags (see builder/main.py) dropped for kernel objects
+WARNING_FLAGS = ("-Wall", "-Wextra")
+
+@lru_cache(maxsize=None)
+def resolve(framework_dir):
+    """Return (src_dir, port_dir, port_name) for a FreeRTOS framework directory."""
+    # Full distribution (FreeRTOS/Source), kernel-only repo (Source), or flat;
+    # one scandir answers which top-level directories exist
+    try:
+        with os.scandir(framework_dir) as it:
+            subdirs = {entry.name for entry in it if entry.is_dir()}
+    except OSError:
+        subdirs = set()
+    
+    if "FreeRTOS" in subdirs and isdir(join(framework_dir, "FreeRTOS", "Source")):
+        src_dir = join(framework_dir, "FreeRTOS", "Source")
+    elif "Source" in subdirs:
+        src_dir = join(framework_dir, "Source")
+    else:
+        src_dir = framework_dir
+    
+    port_dir = join(src_dir, "portable", "GCC", PORT_NAME)
+    return src_dir, port_dir, PORT_NAME
+
+@lru_cache(maxsize=None)
+def kernel_sources(src_dir, port_dir):
+    """List the kernel sources and the port sources, without walking other ports."""
+    try:
+        names = sorted(os.listdir(src_dir))
+    except OSError:
+        names = []
+    sources = [join(src_dir, n) for n in names if n.endswith(".c")]
+    # The port directory is searched recursively, like the +<portable/...>
+    # source filter this replaces
+    for dirpath, dirnames, filenames in os.walk(port_dir):
+        dirnames.sort()
+        sources.extend(join(dirpath, n) for n in sorted(filenames)
+                       if n.endswith((".c", ".S", ".s")))
+    return tuple(sources)
+
+def kernel_ccflags(env):
+    """
+    Return a construction variable callable for the kernel's CCFLAGS.
+
+    It yields env's CCFLAGS without WARNING_FLAGS and reads env only when a
+    command line is built, so debug flags and build_unflags that PlatformIO
+    applies after the framework scripts still reach the kernel objects.
+    """
+    def ccflags(target, source, env_, for_signature):
+        return [flag for flag in env.get("CCFLAGS", []) if flag not in WARNING_FLAGS]
+    return ccflags
+
+def find_framework_dir(env):
+    """Locate FreeRTOS: framework-freertos package first, then lib/FreeRTOS."""
+    framework_dir = None
+    try:
+        framework_dir = env.PioPlatform().get_package_dir("framework-freertos")
+        if not isdir(framework_dir):
+            framework_dir = None
+    except Exception:
+        pass
+    
+    if framework_dir is None:
+        # Try local lib directory using PlatformIO environment expansion
+        local_freertos = join(env.subst("$PROJECT_DIR"), "lib", "FreeRTOS")
+        if isdir(local_freertos):
+            framework_dir = local_freertos
+        else:
+            raise Exception("FreeRTOS not found. Please install it as a PlatformIO package or place it in lib/FreeRTOS")
+    
+    return framework_dir
+
+def configure_freertos(env):
+    """
+    Add FreeRTOS include paths, sources and defines to env.
+
+    Runs once per environment; later calls return the recorded
+    (src_dir, port_dir, port_name) without touching env again.
+    """
+    # SCons environments are unhashable, so memoize in construction variables
+    if env.get("FREERTOS_SRC_DIR"):
+        return env["FREERTOS_SRC_DIR"], env["FREERTOS_PORT_DIR"], env["FREERTOS_PORT_NAME"]
+    
+    src_dir, port_dir, port_name = resolve(find_framework_dir(env))
+    env.Replace(
+        FREERTOS_SRC_DIR=src_dir,
+        FREERTOS_PORT_DIR=port_dir,
+        FREERTOS_PORT_NAME=port_name,
+    )
+    
+    # AppendUnique: projects may already list these (or FREERTOS) in
+    # build_flags, and duplicate -I/-D entries only lengthen every command
+    env.AppendUnique(
+        CPPPATH=[
+            join(src_dir, "include"),
+            port_dir,
+        ],
+        # Prevent PlatformIO library finder from processing FreeRTOS
+        PIO_LIB_SRC_FILTER=[
+            "-<lib/FreeRTOS/>",
+        ]
+    )
+    
+    # Build the kernel plus only the PowerPC port. Objects are declared
+    # explicitly so SCons never descends into the dozens of unused ports.
+    # Kernel objects are built without the platform warning flags, so the
+    # same object is a build cache hit across projects. The override names
+    # a separate variable: a CCFLAGS override that referenced $CCFLAGS
+    # would expand to itself
+    env.Replace(FREERTOS_KERNEL_CCFLAGS=kernel_ccflags(env))
+    env.Append(
+        PIOBUILDFILES=[
+            env.Object(
+                # The full file name keeps port.c and port.S apart
+                join("$BUILD_DIR", "FrameworkFreeRTOS",
+                     relpath(source, src_dir) + "$OBJSUFFIX"),
+                source,
+                CCFLAGS="$FREERTOS_KERNEL_CCFLAGS"
+            )
+            for source in kernel_sources(src_dir, port_dir)
+        ]
+    )
+    
+    env.AppendUnique(
+        CPPDEFINES=[
+            "FREERTOS"
+        ]
+    )
+    
+    return src_dir, port_dir, port_name
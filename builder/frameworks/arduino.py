@@ -19,89 +19,59 @@ Arduino API compatibility layer for PowerPC VLE microcontrollers.
 Built on top of FreeRTOS for multi-tasking support.
 """
 
-from os.path import isdir, join, exists
+from os.path import isdir, join
+import os
 
 from SCons.Script import DefaultEnvironment
 
+import _freertos_common
+
 env = DefaultEnvironment()
 platform = env.PioPlatform()
 board = env.BoardConfig()
 
+# Looked up once and reused for the Arduino framework paths
+PLATFORM_DIR = platform.get_dir()
+
 # First, set up FreeRTOS (Arduino runs on top of FreeRTOS)
-FRAMEWORK_DIR = None
-try:
-    FRAMEWORK_DIR = platform.get_package_dir("framework-freertos")
-    if not isdir(FRAMEWORK_DIR):
-        FRAMEWORK_DIR = None
-except Exception:
-    pass
-
-if FRAMEWORK_DIR is None:
-    import os
-    project_dir = env.subst("$PROJECT_DIR")
-    local_freertos = os.path.join(project_dir, "lib", "FreeRTOS")
-    if isdir(local_freertos):
-        FRAMEWORK_DIR = local_freertos
-    else:
-        raise Exception("FreeRTOS not found. Please install it as a PlatformIO package or place it in lib/FreeRTOS")
-
-if FRAMEWORK_DIR is None or not isdir(FRAMEWORK_DIR):
-    raise Exception("FreeRTOS framework directory not found: %s" % FRAMEWORK_DIR)
-
-# FreeRTOS directory structure
-if isdir(join(FRAMEWORK_DIR, "FreeRTOS", "Source")):
-    FREERTOS_SRC_DIR = join(FRAMEWORK_DIR, "FreeRTOS", "Source")
-elif isdir(join(FRAMEWORK_DIR, "Source")):
-    FREERTOS_SRC_DIR = join(FRAMEWORK_DIR, "Source")
-else:
-    FREERTOS_SRC_DIR = FRAMEWORK_DIR
-
-FREERTOS_PORT_DIR = join(FREERTOS_SRC_DIR, "portable", "GCC", "PowerPC")
+FREERTOS_SRC_DIR, FREERTOS_PORT_DIR, _ = _freertos_common.configure_freertos(env)
 
 # Get Arduino framework directory (within platform)
-ARDUINO_FRAMEWORK_DIR = join(platform.get_dir(), "frameworks", "arduino")
+ARDUINO_FRAMEWORK_DIR = join(PLATFORM_DIR, "frameworks", "arduino")
 ARDUINO_CORE_DIR = join(ARDUINO_FRAMEWORK_DIR, "cores", "powerpc")
 ARDUINO_LIBRARIES_DIR = join(ARDUINO_FRAMEWORK_DIR, "libraries")
 
-# Add include paths
+# Add include paths; $PROJECT_DIR is resolved once so SCons does not
+# re-substitute it for every command line it builds
+PROJECT_DIR = env.subst("$PROJECT_DIR")
 include_paths = [
-    join(FREERTOS_SRC_DIR, "include"),
-    FREERTOS_PORT_DIR,
     ARDUINO_CORE_DIR,
     ARDUINO_LIBRARIES_DIR,
-    join("$PROJECT_DIR", "include"),
-    join("$PROJECT_DIR", "src"),
+    join(PROJECT_DIR, "include"),
+    join(PROJECT_DIR, "src"),
 ]
 
-# Add library include paths
+# Collect library directories once; reused for include paths and sources
+ARDUINO_LIBRARY_DIRS = []
 if isdir(ARDUINO_LIBRARIES_DIR):
-    import os
-    for item in os.listdir(ARDUINO_LIBRARIES_DIR):
-        lib_path = join(ARDUINO_LIBRARIES_DIR, item)
-        if isdir(lib_path):
-            include_paths.append(lib_path)
+    with os.scandir(ARDUINO_LIBRARIES_DIR) as it:
+        ARDUINO_LIBRARY_DIRS = sorted(
+            (e.name, e.path) for e in it if e.is_dir(follow_symlinks=False)
+        )
 
-env.Append(
+# Add library include paths
+include_paths.extend(lib_path for _, lib_path in ARDUINO_LIBRARY_DIRS)
+
+# AppendUnique keeps each -I once if the FreeRTOS or project paths were
+# already added by another builder
+env.AppendUnique(
     CPPPATH=include_paths,
-    # Prevent PlatformIO library finder from processing FreeRTOS and Arduino
+    # Prevent PlatformIO library finder from processing Arduino
     PIO_LIB_SRC_FILTER=[
-        "-<lib/FreeRTOS/>",
         "-<frameworks/arduino/>",
     ]
 )
 
-# Add FreeRTOS source files
-src_filter = [
-    "-<portable/>",
-    "+<portable/GCC/PowerPC/>",
-]
-
-env.BuildSources(
-    join("$BUILD_DIR", "FrameworkFreeRTOS"),
-    FREERTOS_SRC_DIR,
-    src_filter=src_filter
-)
-
 # Add Arduino core source files
 if isdir(ARDUINO_CORE_DIR):
     env.BuildSources(
@@ -109,22 +79,22 @@ if isdir(ARDUINO_CORE_DIR):
         ARDUINO_CORE_DIR
     )
 
-# Add Arduino library source files
-if isdir(ARDUINO_LIBRARIES_DIR):
-    import os
-    for item in os.listdir(ARDUINO_LIBRARIES_DIR):
-        lib_path = join(ARDUINO_LIBRARIES_DIR, item)
-        if isdir(lib_path):
-            # Look for .cpp files in the library directory
-            env.BuildSources(
-                join("$BUILD_DIR", "FrameworkArduino", "libraries", item),
-                lib_path
-            )
+# Add Arduino library source files in one pass; objects still land in
+# FrameworkArduino/libraries/<name>/ as with per-library builds. The filter
+# replaces PlatformIO's default one, so each library keeps its VCS excludes
+if ARDUINO_LIBRARY_DIRS:
+    src_filter = ["-<*>"]
+    for item, _ in ARDUINO_LIBRARY_DIRS:
+        src_filter += ["+<%s/>" % item, "-<%s/.git/>" % item, "-<%s/.svn/>" % item]
+    env.BuildSources(
+        join("$BUILD_DIR", "FrameworkArduino", "libraries"),
+        ARDUINO_LIBRARIES_DIR,
+        src_filter=src_filter
+    )
 
 # Add framework defines
 env.Append(
     CPPDEFINES=[
-        "FREERTOS",
         "ARDUINO",
         "ARDUINO_DEVKIT_MPC5744P",
         ("ARDUINO_ARCH_POWERPC", "1"),
@@ -132,8 +102,11 @@ env.Append(
     ]
 )
 
-print("Arduino framework initialized for NXP PowerPC VLE")
-print("  - FreeRTOS Source: %s" % FREERTOS_SRC_DIR)
-print("  - Arduino Core: %s" % ARDUINO_CORE_DIR)
-print("  - Arduino Libraries: %s" % ARDUINO_LIBRARIES_DIR)
+# One write for the whole summary
+print("\n".join([
+    "Arduino framework initialized for NXP PowerPC VLE",
+    "  - FreeRTOS Source: %s" % FREERTOS_SRC_DIR,
+    "  - Arduino Core: %s" % ARDUINO_CORE_DIR,
+    "  - Arduino Libraries: %s" % ARDUINO_LIBRARIES_DIR,
+]))
 
@@ -20,7 +20,7 @@ Automatically includes startup code templates if user has not provided their own
 Supports user-provided startup code, linker scripts, and standard C library.
 """
 
-from os.path import isdir, join, exists
+from os.path import isfile, join, exists
 import os
 
 from SCons.Script import DefaultEnvironment
@@ -29,70 +29,95 @@ env = DefaultEnvironment()
 platform = env.PioPlatform()
 board = env.BoardConfig()
 
+# Looked up once and reused by the startup template search
+PLATFORM_DIR = platform.get_dir()
+
 # No framework package - this is baremetal
 # Startup code is automatically included if user hasn't provided their own
 
 # Add common include paths if they exist
 # Users can add custom include paths via build_flags in platformio.ini
-potential_include_dirs = [
-    join("$PROJECT_DIR", "include"),
-    join("$PROJECT_DIR", "src"),
-    join("$PROJECT_DIR", "lib"),
-]
+potential_include_dirs = ["include", "src", "lib"]
+
+# Add library search paths
+potential_lib_dirs = ["lib"]
+
+# One scandir of the project root answers every isdir() probe above
+def list_subdirs(top):
+    """Return the names of the directories directly below top."""
+    try:
+        with os.scandir(top) as it:
+            return {entry.name for entry in it if entry.is_dir()}
+    except OSError:
+        return set()
+
+PROJECT_DIR = env.subst("$PROJECT_DIR")
+project_subdirs = list_subdirs(PROJECT_DIR)
 
 env.Append(
     CPPPATH=[
-        d for d in potential_include_dirs if isdir(env.subst(d))
+        join(PROJECT_DIR, d) for d in potential_include_dirs if d in project_subdirs
     ]
 )
 
-# Add library search paths
-potential_lib_dirs = [
-    join("$PROJECT_DIR", "lib"),
-]
-
 env.Append(
     LIBPATH=[
-        d for d in potential_lib_dirs if isdir(env.subst(d))
+        join(PROJECT_DIR, d) for d in potential_lib_dirs if d in project_subdirs
     ]
 )
 
+def iter_assembly_files(top):
+    """Yield paths of .S/.s files below top using os.scandir."""
+    try:
+        with os.scandir(top) as it:
+            entries = list(it)
+    except OSError:
+        return
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            yield from iter_assembly_files(entry.path)
+        elif entry.name.endswith((".S", ".s")):
+            yield entry.path
+
+# Files smaller than this are read directly; mapping them costs more than it saves
+MMAP_MIN_SIZE = 64 * 1024
+
+def has_start_symbol(file_path):
+    """Check for a _start symbol with a single byte-level search (no decode)."""
+    try:
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            # ".globl _start" variants all contain "_start"
+            if size < MMAP_MIN_SIZE:
+                return f.read().find(b'_start') != -1
+            import mmap
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return mm.find(b'_start') != -1
+    except (OSError, ValueError):
+        return False
+
 # Auto-detect and include startup code if user hasn't provided their own
 # Priority:
 # 1. User-provided startup file in src/ (startup.S, startup.s, startup.c, or _start symbol)
 # 2. Platform-provided startup template for the board
 def find_startup_code():
     """Find appropriate startup code with fallback hierarchy."""
-    project_src = env.subst("$PROJECT_DIR/src")
+    project_src = join(PROJECT_DIR, "src")
     
-    # Check if user has provided startup code
-    startup_patterns = ["startup.S", "startup.s", "startup.c"]
-    if isdir(project_src):
-        for pattern in startup_patterns:
-            startup_file = join(project_src, pattern)
-            if exists(startup_file):
-                # User has provided startup code
-                return None
-    
-    # Check for _start symbol in any .S file in src/
-    if isdir(project_src):
-        for root, dirs, files in os.walk(project_src):
-            for file in files:
-                if file.endswith((".S", ".s")):
-                    file_path = join(root, file)
-                    try:
-                        with open(file_path, 'r') as f:
-                            content = f.read()
-                            if '_start' in content or '.globl\t_start' in content or '.globl _start' in content:
-                                # User has provided startup code
-                                return None
-                    except (IOError, UnicodeDecodeError):
-                        pass
+    if "src" in project_subdirs:
+        # Check if user has provided startup code
+        startup_patterns = ["startup.S", "startup.s", "startup.c"]
+        if any(isfile(join(project_src, p)) for p in startup_patterns):
+            return None
+        
+        # Check for _start symbol in any .S file in src/ (lazy walk, stops
+        # at the first hit and costs nothing when there is no assembly)
+        if any(has_start_symbol(p) for p in iter_assembly_files(project_src)):
+            return None
     
     # No user startup code found - use platform template
     board_mcu = board.get("build.mcu", "").lower()
-    platform_dir = platform.get_dir()
-    startup_template = join(platform_dir, "startup", f"{board_mcu}_startup.S")
+    startup_template = join(PLATFORM_DIR, "startup", f"{board_mcu}_startup.S")
     
     if exists(startup_template):
         return startup_template
@@ -105,17 +130,22 @@ if startup_code:
     # Build startup code from platform template
     env.BuildSources(
         join("$BUILD_DIR", "PlatformStartup"),
-        join(platform.get_dir(), "startup"),
+        join(PLATFORM_DIR, "startup"),
         src_filter=[f"+<{os.path.basename(startup_code)}>", "-<*>"]
     )
-    print("Baremetal framework initialized for NXP PowerPC VLE")
-    print(f"  - Using platform startup template: {os.path.basename(startup_code)}")
-    print("  - Startup code automatically included")
-    print("  - Linker script will be auto-detected from platform or project")
+    startup_lines = [
+        f"  - Using platform startup template: {os.path.basename(startup_code)}",
+        "  - Startup code automatically included",
+    ]
 else:
-    print("Baremetal framework initialized for NXP PowerPC VLE")
-    print("  - Using user-provided startup code")
-    print("  - Linker script will be auto-detected from platform or project")
+    startup_lines = ["  - Using user-provided startup code"]
+
+# One write for the whole summary
+print("\n".join([
+    "Baremetal framework initialized for NXP PowerPC VLE",
+    *startup_lines,
+    "  - Linker script will be auto-detected from platform or project",
+]))
 
 # Users can specify custom linker scripts via build_flags:
 # build_flags = -T path/to/linker.ld
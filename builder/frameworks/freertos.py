@@ -19,115 +19,42 @@ FreeRTOS real-time operating system support for PowerPC VLE microcontrollers.
 This builder configures FreeRTOS source files and port files for PowerPC VLE.
 """
 
-from os.path import isdir, join, exists
+from os.path import isdir, join
 
 from SCons.Script import DefaultEnvironment
 
+import _freertos_common
+
 env = DefaultEnvironment()
 platform = env.PioPlatform()
 board = env.BoardConfig()
 
-# Try to get FreeRTOS from package, fallback to local lib directory
-FRAMEWORK_DIR = None
-try:
-    FRAMEWORK_DIR = platform.get_package_dir("framework-freertos")
-    if not isdir(FRAMEWORK_DIR):
-        FRAMEWORK_DIR = None
-except Exception:
-    pass
-
-if FRAMEWORK_DIR is None:
-    # Try local lib directory using PlatformIO environment expansion
-    import os
-    project_dir = env.subst("$PROJECT_DIR")
-    local_freertos = os.path.join(project_dir, "lib", "FreeRTOS")
-    if isdir(local_freertos):
-        FRAMEWORK_DIR = local_freertos
-    else:
-        raise Exception("FreeRTOS not found. Please install it as a PlatformIO package or place it in lib/FreeRTOS")
-
-if FRAMEWORK_DIR is None or not isdir(FRAMEWORK_DIR):
-    raise Exception("FreeRTOS framework directory not found: %s" % FRAMEWORK_DIR)
-
-# FreeRTOS directory structure - check if it's the kernel repo structure
-if isdir(join(FRAMEWORK_DIR, "FreeRTOS", "Source")):
-    # Full FreeRTOS distribution structure
-    FREERTOS_SRC_DIR = join(FRAMEWORK_DIR, "FreeRTOS", "Source")
-elif isdir(join(FRAMEWORK_DIR, "Source")):
-    # Kernel-only repo structure
-    FREERTOS_SRC_DIR = join(FRAMEWORK_DIR, "Source")
-else:
-    # Assume flat structure
-    FREERTOS_SRC_DIR = FRAMEWORK_DIR
+# Locate FreeRTOS, add its include paths, kernel sources and defines
+FREERTOS_SRC_DIR, FREERTOS_PORT_DIR, _ = _freertos_common.configure_freertos(env)
 
-FREERTOS_PORT_DIR = join(FREERTOS_SRC_DIR, "portable", "GCC", "PowerPC")
-
-# Add FreeRTOS include paths
-env.Append(
+# Project include paths, resolved once so SCons does not re-substitute
+# $PROJECT_DIR for every command line it builds. AppendUnique keeps each
+# -I once when another builder has already added the same directory
+PROJECT_DIR = env.subst("$PROJECT_DIR")
+env.AppendUnique(
     CPPPATH=[
-        join(FREERTOS_SRC_DIR, "include"),
-        FREERTOS_PORT_DIR,
-        join("$PROJECT_DIR", "include"),
-        join("$PROJECT_DIR", "src"),
-    ],
-    # Prevent PlatformIO library finder from processing FreeRTOS
-    PIO_LIB_SRC_FILTER=[
-        "-<lib/FreeRTOS/>",  # Exclude FreeRTOS from library finder
-    ]
-)
-
-# Add FreeRTOS source files
-freertos_sources = [
-    join(FREERTOS_SRC_DIR, "croutine.c"),
-    join(FREERTOS_SRC_DIR, "event_groups.c"),
-    join(FREERTOS_SRC_DIR, "list.c"),
-    join(FREERTOS_SRC_DIR, "queue.c"),
-    join(FREERTOS_SRC_DIR, "stream_buffer.c"),
-    join(FREERTOS_SRC_DIR, "tasks.c"),
-    join(FREERTOS_SRC_DIR, "timers.c"),
-]
-
-# Add port-specific sources (check if PowerPC port exists, otherwise use generic)
-port_sources = [
-    join(FREERTOS_PORT_DIR, "port.c"),
-]
-
-# Check if port.c exists, if not, we may need to use a different port
-# For now, assume PowerPC port exists
-for source in port_sources:
-    if not isdir(FREERTOS_PORT_DIR):
-        # If PowerPC port doesn't exist, fall back to a generic approach
-        # In practice, users may need to provide their own port
-        print("Warning: PowerPC FreeRTOS port not found. You may need to provide your own port implementation.")
-        break
-
-# Add FreeRTOS source files directly to the build - compile specific files only
-# Filter out sources that don't exist
-valid_freertos_sources = [env.subst(s) for s in freertos_sources if exists(s)]
-valid_port_sources = [env.subst(s) for s in port_sources if exists(s)]
-
-# Create source filter to exclude all portable ports except PowerPC
-src_filter = [
-    "-<portable/>",  # Exclude all portable directories
-    "+<portable/GCC/PowerPC/>",  # Include only PowerPC port
-]
-
-# Add FreeRTOS sources with filter
-env.BuildSources(
-    join("$BUILD_DIR", "FrameworkFreeRTOS"),
-    FREERTOS_SRC_DIR,
-    src_filter=src_filter
-)
-
-# Add FreeRTOS defines
-env.Append(
-    CPPDEFINES=[
-        "FREERTOS"
+        join(PROJECT_DIR, "include"),
+        join(PROJECT_DIR, "src"),
     ]
 )
 
-print("FreeRTOS framework initialized for NXP PowerPC VLE")
-print("  - FreeRTOS Source: %s" % FREERTOS_SRC_DIR)
-print("  - Port Directory: %s" % FREERTOS_PORT_DIR)
+# Kernel and port objects come from configure_freertos; only warn here
+# when the PowerPC port is missing
+if not isdir(FREERTOS_PORT_DIR):
+    # If PowerPC port doesn't exist, fall back to a generic approach
+    # In practice, users may need to provide their own port
+    print("Warning: PowerPC FreeRTOS port not found. You may need to provide your own port implementation.")
+
+# One write for the whole summary
+print("\n".join([
+    "FreeRTOS framework initialized for NXP PowerPC VLE",
+    "  - FreeRTOS Source: %s" % FREERTOS_SRC_DIR,
+    "  - Port Directory: %s" % FREERTOS_PORT_DIR,
+]))
 
 
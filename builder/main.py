@@ -22,7 +22,8 @@ Toolchain Source (Golden Source):
 https://github.com/dapperfu/platform-nxppowerpc/releases/download/v.0.0.1/gcc-4.9.4-Ee200-eabivle-x86_64-linux-g2724867.zip
 """
 
-from os.path import join, exists
+from functools import lru_cache
+from os.path import join
 import os
 
 from SCons.Script import (COMMAND_LINE_TARGETS, AlwaysBuild, Builder, Default,
@@ -31,16 +32,68 @@ from SCons.Script import (COMMAND_LINE_TARGETS, AlwaysBuild, Builder, Default,
 env = DefaultEnvironment()
 platform = env.PioPlatform()
 
+# Only re-hash sources whose timestamp changed. Set POWERPC_DECIDER=MD5 on
+# filesystems with unreliable mtimes (e.g. Docker bind mounts on macOS).
+env.Decider(os.environ.get("POWERPC_DECIDER", "MD5-timestamp"))
+# Reuse stored content signatures for files not modified in the last second
+env.SetOption("max_drift", 1)
+# Reusing the cached #include scan is opt-in: after changing CPPPATH or adding
+# a header that shadows another one, the build must be cleaned
+if os.environ.get("POWERPC_IMPLICIT_CACHE") == "1":
+    env.SetOption("implicit_cache", 1)
+
+# Looked up once and reused by the toolchain and linker script searches
+PLATFORM_DIR = platform.get_dir()
+HOME_DIR = os.path.expanduser("~")
+PROJECT_DIR = env.subst("$PROJECT_DIR")
+BUILD_DIR = env.subst("$BUILD_DIR")
+
 # Toolchain golden source URL (for reference and manual download)
 TOOLCHAIN_URL = "https://github.com/dapperfu/platform-nxppowerpc/releases/download/v.0.0.1/gcc-4.9.4-Ee200-eabivle-x86_64-linux-g2724867.zip"
 
-# Try to get toolchain package directory, fallback to system toolchain
-TOOLCHAIN_DIR = None
-TOOLCHAIN_PREFIX = "powerpc-eabivle-"
+# Tool name prefix; TOOLCHAIN_DIR and TOOLCHAIN_PREFIX are bound once, from
+# the result of the toolchain resolvers below
+TOOLCHAIN_TRIPLET = "powerpc-eabivle-"
+
+def package_tool_prefix(toolchain_dir):
+    """Full tool name prefix for a toolchain package rooted at toolchain_dir."""
+    return join(toolchain_dir, "bin", TOOLCHAIN_TRIPLET)
+
+# SCons tool variable -> toolchain executable suffix
+TOOL_NAMES = {
+    "AR": "ar",
+    "AS": "as",
+    "CC": "gcc",
+    "CXX": "g++",
+    "OBJCOPY": "objcopy",
+    "OBJDUMP": "objdump",
+    "RANLIB": "ranlib",
+    "SIZETOOL": "size",
+}
+
+# Memoized os.stat results for the toolchain and linker search. The
+# filesystem is treated as stable during one SCons run; the cache is
+# cleared after installing a toolchain.
+_STAT_CACHE = {}
+
+def _cached_stat(path):
+    """Return os.stat(path), or None if it does not exist, memoized per path."""
+    try:
+        return _STAT_CACHE[path]
+    except KeyError:
+        pass
+    try:
+        st = os.stat(path)
+    except OSError:
+        st = None
+    _STAT_CACHE[path] = st
+    return st
+
+def _cached_exists(path):
+    return _cached_stat(path) is not None
 
 # System toolchain paths - check common installation locations
 # Users can override via environment variable POWERPC_TOOLCHAIN_PATH
-import os
 SYSTEM_TOOLCHAIN_PATHS = []
 
 # Check environment variable first
@@ -52,250 +105,425 @@ if os.environ.get("POWERPC_TOOLCHAIN_PATH"):
 # These are standard locations where toolchains are typically installed
 standard_paths = [
     # S32DS installation locations (relative to common install paths)
-    os.path.join(os.path.expanduser("~"), "S32DS", "build_tools", "powerpc-eabivle-4_9", "powerpc-eabivle", "bin"),
+    os.path.join(HOME_DIR, "S32DS", "build_tools", "powerpc-eabivle-4_9", "powerpc-eabivle", "bin"),
     os.path.join("S32DS", "build_tools", "powerpc-eabivle-4_9", "powerpc-eabivle", "bin"),
     # Standard Unix installation paths
-    os.path.join(os.path.expanduser("~"), "powerpc-eabivle", "bin"),
+    os.path.join(HOME_DIR, "powerpc-eabivle", "bin"),
     "/opt/powerpc-eabivle/bin",  # Standard /opt location
     "/usr/local/powerpc-eabivle/bin",  # Standard /usr/local location
 ]
 
 SYSTEM_TOOLCHAIN_PATHS.extend(standard_paths)
 
+# POWERPC_TOOLCHAIN_PATH may point at one of the standard locations; keep the
+# first occurrence so each directory is searched once
+SYSTEM_TOOLCHAIN_PATHS = list(dict.fromkeys(SYSTEM_TOOLCHAIN_PATHS))
+
 # Get toolchain from PlatformIO package system
 # PlatformIO automatically installs packages listed in platform.json from tools/<package-name>/package.json
 # This works seamlessly like official toolchains (e.g., toolchain-armeabigcc)
-TOOLCHAIN_DIR = None
 
+@lru_cache(maxsize=8)
 def find_toolchain_in_dir(pkg_dir):
-    """Find toolchain compiler in package directory, handling nested structures."""
-    if not pkg_dir or not exists(pkg_dir):
+    """Find toolchain compiler in package directory, handling nested structures.
+
+    Memoized per pkg_dir, like the stat cache; cleared after an install.
+    """
+    # No separate existence check: a missing pkg_dir fails the gcc stat and
+    # the scandir below just as cheaply
+    if not pkg_dir:
         return None
     
     # Check root level first
-    gcc_path = join(pkg_dir, "bin", TOOLCHAIN_PREFIX + "gcc")
-    if exists(gcc_path):
+    gcc_path = join(pkg_dir, "bin", TOOLCHAIN_TRIPLET + "gcc")
+    if _cached_exists(gcc_path):
         return pkg_dir
     
-    # Check nested subdirectories (e.g., powerpc-eabivle-4_9/bin)
+    # Check nested subdirectories (e.g., powerpc-eabivle-4_9/bin); DirEntry
+    # carries the file type, so only the gcc probe costs a stat
     try:
-        for item in os.listdir(pkg_dir):
-            subdir = join(pkg_dir, item)
-            if os.path.isdir(subdir):
-                subdir_gcc = join(subdir, "bin", TOOLCHAIN_PREFIX + "gcc")
-                if exists(subdir_gcc):
-                    return subdir
+        with os.scandir(pkg_dir) as it:
+            for entry in it:
+                if entry.is_dir():
+                    subdir_gcc = join(entry.path, "bin", TOOLCHAIN_TRIPLET + "gcc")
+                    if _cached_exists(subdir_gcc):
+                        return entry.path
     except OSError:
         pass
     
     return None
 
-try:
-    TOOLCHAIN_DIR = platform.get_package_dir("toolchain-powerpc-eabivle")
-    if TOOLCHAIN_DIR:
-        # Verify toolchain is actually present
-        actual_dir = find_toolchain_in_dir(TOOLCHAIN_DIR)
-        if actual_dir:
-            TOOLCHAIN_DIR = actual_dir
-            TOOLCHAIN_PREFIX = join(TOOLCHAIN_DIR, "bin", TOOLCHAIN_PREFIX)
-        else:
-            TOOLCHAIN_DIR = None
-except Exception:
-    TOOLCHAIN_DIR = None
+# Toolchain resolved by a previous run, keyed on everything that can change
+# the outcome of the search below
+TOOLCHAIN_CACHE_FILE = join(BUILD_DIR, ".toolchain_cache.json")
 
-# Fallback: Auto-install from tools/package.json if PlatformIO dependency resolution hasn't run yet
-# This ensures seamless installation like official toolchains, even for git-installed platforms
-if TOOLCHAIN_DIR is None:
+@lru_cache(maxsize=None)
+def package_dir(name):
+    """Memoized platform.get_package_dir; None if the package is unavailable."""
     try:
-        tools_package_json = join(
-            platform.get_dir(),
-            "tools",
-            "toolchain-powerpc-eabivle",
-            "package.json"
-        )
-        if exists(tools_package_json):
-            # Read package.json to get the GitHub release URL
-            import json
-            with open(tools_package_json, 'r') as f:
-                pkg_manifest = json.load(f)
-            
-            # Get the download URL for this system
-            import platform as py_platform
-            system = "linux_x86_64" if py_platform.machine() == "x86_64" else "linux_x86"
-            if system in pkg_manifest.get("urls", {}):
-                package_url = pkg_manifest["urls"][system]
-                pkg_name = pkg_manifest["name"]
-                pkg_version = pkg_manifest["version"]
-                
-                # Check if package is already installed (may have been installed by PlatformIO after our check)
-                try:
-                    existing_pkg_dir = platform.get_package_dir(pkg_name)
-                    if existing_pkg_dir:
-                        found_dir = find_toolchain_in_dir(existing_pkg_dir)
-                        if found_dir:
-                            TOOLCHAIN_DIR = found_dir
-                            TOOLCHAIN_PREFIX = join(TOOLCHAIN_DIR, "bin", TOOLCHAIN_PREFIX)
-                except Exception:
-                    pass
-                
-                # Calculate packages directory - PlatformIO stores in .platformio/packages/
-                # Do this outside the if block so pkg_install_dir is always defined
-                platform_dir = platform.get_dir()
-                # Try multiple possible locations
-                possible_packages_dirs = [
-                    join(platform_dir, "..", "packages"),  # .platformio/packages/
-                    join(platform_dir, "..", "..", "packages"),  # Alternative
-                ]
-                
-                # Also try getting from environment or platform config
-                import os as os_module
-                pio_home = os_module.environ.get("PLATFORMIO_HOME_DIR") or os_module.environ.get("HOME")
-                if pio_home:
-                    possible_packages_dirs.insert(0, join(pio_home, ".platformio", "packages"))
-                
-                packages_dir = None
-                for pd in possible_packages_dirs:
-                    if exists(pd):
-                        packages_dir = pd
-                        break
-                
-                if not packages_dir:
-                    # Default fallback - use platform directory structure
-                    packages_dir = join(platform_dir, "..", "packages")
-                    os.makedirs(packages_dir, exist_ok=True)
-                
-                pkg_install_dir = join(packages_dir, pkg_name)
-                
-                # If not already found, download and install
-                if not TOOLCHAIN_DIR:
-                    # Check if already installed in packages directory
-                    if not find_toolchain_in_dir(pkg_install_dir):
-                        print("Downloading toolchain from GitHub releases...")
-                        print("  URL: %s" % package_url)
-                        print("  Installing to: %s" % pkg_install_dir)
-                        
-                        # Download and extract the toolchain
-                        import urllib.request
-                        import zipfile
-                        import tempfile
-                        
-                        try:
-                            with tempfile.NamedTemporaryFile(delete=False, suffix=".zip") as tmp_zip:
-                                zip_path = tmp_zip.name
-                            
-                            print("  Downloading archive...")
-                            urllib.request.urlretrieve(package_url, zip_path)
-                            
-                            print("  Extracting archive...")
-                            # Extract to packages directory
-                            os.makedirs(pkg_install_dir, exist_ok=True)
-                            with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-                                zip_ref.extractall(pkg_install_dir)
-                            
-                            # Remove temp file
-                            os.unlink(zip_path)
-                            
-                            print("Toolchain installed successfully.")
-                        except Exception as download_error:
-                            print("ERROR: Failed to download/install toolchain: %s" % str(download_error))
-                            import traceback
-                            traceback.print_exc()
-                            raise
-                    
-                    # Find toolchain after installation
-                    found_dir = find_toolchain_in_dir(pkg_install_dir)
-                    if found_dir:
-                        TOOLCHAIN_DIR = found_dir
-                        TOOLCHAIN_PREFIX = join(TOOLCHAIN_DIR, "bin", TOOLCHAIN_PREFIX)
-                        print("Using PlatformIO toolchain package: %s" % TOOLCHAIN_DIR)
+        return platform.get_package_dir(name)
+    except Exception:
+        return None
+
+def _mtime_ns(path):
+    st = _cached_stat(path)
+    return st.st_mtime_ns if st else None
+
+# Only cheap inputs (a few stats) go into the key: the package lookup is
+# what a cache hit saves, so package_dir() is only consulted on a miss
+PACKAGES_DIR = env.subst("$PROJECT_PACKAGES_DIR")
+TOOLCHAIN_PACKAGE_JSON = join(PACKAGES_DIR, "toolchain-powerpc-eabivle", "package.json")
+
+def toolchain_cache_key():
+    """Key for the toolchain cache; re-read on save to see a fresh install."""
+    return {
+        "platform_version": str(getattr(platform, "version", "")),
+        # Directory mtimes only change when entries are added or removed:
+        # they catch a reinstalled platform and packages being installed or
+        # removed, not files edited in place
+        "platform_dir": PLATFORM_DIR,
+        "platform_mtime": _mtime_ns(PLATFORM_DIR),
+        "packages_dir": PACKAGES_DIR,
+        "packages_mtime": _mtime_ns(PACKAGES_DIR),
+        # The manifest is rewritten whenever the toolchain package is
+        # installed or upgraded, including in place under the same name
+        "toolchain_manifest_mtime": _mtime_ns(TOOLCHAIN_PACKAGE_JSON),
+        "toolchain_path_env": os.environ.get("POWERPC_TOOLCHAIN_PATH"),
+    }
+
+def load_toolchain_cache():
+    """Return cached (TOOLCHAIN_DIR, TOOLCHAIN_PREFIX) if still valid, else None."""
+    import json
+    try:
+        with open(TOOLCHAIN_CACHE_FILE, 'r') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("key") != toolchain_cache_key():
+        return None
+    # A single stat confirms the compiler is still there
+    if not _cached_exists(cached["prefix"] + "gcc"):
+        return None
+    return cached["dir"], cached["prefix"]
+
+def save_toolchain_cache(toolchain_dir, toolchain_prefix):
+    """Persist the resolved toolchain for the next run (best effort)."""
+    import json
+    try:
+        os.makedirs(os.path.dirname(TOOLCHAIN_CACHE_FILE), exist_ok=True)
+        with open(TOOLCHAIN_CACHE_FILE, 'w') as f:
+            json.dump({
+                "key": toolchain_cache_key(),
+                "dir": toolchain_dir,
+                "prefix": toolchain_prefix,
+            }, f)
+    except OSError:
+        pass
+
+# Buffer size for streaming the toolchain download and archive members
+COPY_BUFFER_SIZE = 1 << 20
+# Downloads up to this size are extracted straight from memory
+SPOOL_MAX_SIZE = 64 << 20
+
+def download_to(url, fileobj):
+    """Stream url into fileobj, returning the SHA-256 hex digest of the body."""
+    import hashlib
+    import urllib.request
+    digest = hashlib.sha256()
+    written = 0
+    with urllib.request.urlopen(url) as response:
+        expected = response.headers.get("Content-Length")
+        while True:
+            chunk = response.read(COPY_BUFFER_SIZE)
+            if not chunk:
+                break
+            digest.update(chunk)
+            fileobj.write(chunk)
+            written += len(chunk)
+    # Catch truncated downloads before they surface as a corrupt zip
+    if expected is not None and int(expected) != written:
+        raise IOError("Incomplete download: got %d of %s bytes" % (written, expected))
+    return digest.hexdigest()
+
+def extract_zip(zip_ref, target_dir):
+    """Extract all members of zip_ref below target_dir with large copy buffers."""
+    import shutil
+    target_root = os.path.realpath(target_dir)
+    # Sorted names keep each directory's entries together on disk
+    for info in sorted(zip_ref.infolist(), key=lambda i: i.filename):
+        dest = os.path.realpath(join(target_root, info.filename))
+        if dest != target_root and not dest.startswith(target_root + os.sep):
+            raise ValueError("Unsafe path in archive: %s" % info.filename)
+        if info.is_dir():
+            os.makedirs(dest, exist_ok=True)
+            continue
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        with zip_ref.open(info) as src, open(dest, 'wb') as dst:
+            shutil.copyfileobj(src, dst, length=COPY_BUFFER_SIZE)
+        # Keep the executable bits of the toolchain binaries
+        mode = (info.external_attr >> 16) & 0o777
+        if mode:
+            os.chmod(dest, mode)
+
+TOOLS_PACKAGE_JSON = join(
+    PLATFORM_DIR,
+    "tools",
+    "toolchain-powerpc-eabivle",
+    "package.json"
+)
+
+# Toolchain resolvers, tried in order until one returns
+# (TOOLCHAIN_DIR, TOOLCHAIN_PREFIX); a None TOOLCHAIN_DIR means "use PATH"
+
+def resolve_package_toolchain():
+    """Toolchain package installed by PlatformIO from platform.json."""
+    found_dir = find_toolchain_in_dir(package_dir("toolchain-powerpc-eabivle"))
+    if found_dir:
+        return found_dir, package_tool_prefix(found_dir)
+    return None
+
+def resolve_manifest_toolchain():
+    """Fallback: auto-install from tools/package.json if PlatformIO dependency resolution hasn't run yet.
+
+    This ensures seamless installation like official toolchains, even for
+    git-installed platforms.
+    """
+    # Cheap pre-check so the installer is skipped when no manifest ships
+    if not _cached_exists(TOOLS_PACKAGE_JSON):
+        return None
+    try:
+        # Read package.json to get the GitHub release URL
+        import json
+        with open(TOOLS_PACKAGE_JSON, 'r') as f:
+            pkg_manifest = json.load(f)
+        
+        # Get the download URL for this system
+        import platform as py_platform
+        system = "linux_x86_64" if py_platform.machine() == "x86_64" else "linux_x86"
+        if system not in pkg_manifest.get("urls", {}):
+            return None
+        package_url = pkg_manifest["urls"][system]
+        pkg_name = pkg_manifest["name"]
+        
+        # Check if package is already installed
+        found_dir = find_toolchain_in_dir(package_dir(pkg_name))
+        if found_dir:
+            return found_dir, package_tool_prefix(found_dir)
+        
+        # Install where PlatformIO looks for packages (packages_dir in
+        # platformio.ini or <core_dir>/packages), the directory the toolchain
+        # cache is keyed on
+        os.makedirs(PACKAGES_DIR, exist_ok=True)
+        
+        pkg_install_dir = join(PACKAGES_DIR, pkg_name)
+        
+        # Check if already installed in packages directory
+        found_dir = find_toolchain_in_dir(pkg_install_dir)
+        if not found_dir:
+            install_toolchain(package_url, pkg_install_dir, pkg_manifest.get("sha256", {}).get(system))
+            # Find toolchain after installation
+            found_dir = find_toolchain_in_dir(pkg_install_dir)
+        
+        if found_dir:
+            print(f"Using PlatformIO toolchain package: {found_dir}")
+            return found_dir, package_tool_prefix(found_dir)
     except Exception as install_error:
         # Package installation failed, continue to system toolchain check
-        import traceback
-        print("Error during toolchain download/installation: %s" % str(install_error))
+        print(f"Error during toolchain download/installation: {install_error}")
         print("Attempting automatic toolchain installation from platform tools directory...")
-        traceback.print_exc()
-
-# If PlatformIO package not found, try system toolchain
-if TOOLCHAIN_DIR is None:
-    for sys_path in SYSTEM_TOOLCHAIN_PATHS:
-        gcc_path = join(sys_path, TOOLCHAIN_PREFIX + "gcc")
-        if exists(gcc_path):
-            TOOLCHAIN_DIR = sys_path
-            # Use full paths for system toolchain
-            TOOLCHAIN_PREFIX = join(sys_path, TOOLCHAIN_PREFIX)
-            print("Using system toolchain: %s" % TOOLCHAIN_DIR)
-            break
-    
-    if TOOLCHAIN_DIR is None:
-        # Still not found, try PATH
-        import shutil
-        which_gcc = shutil.which(TOOLCHAIN_PREFIX + "gcc")
-        if which_gcc:
-            TOOLCHAIN_PREFIX = TOOLCHAIN_PREFIX
-            print("Using system toolchain from PATH: %s" % which_gcc)
+        # Stack traces are only useful when debugging the installer itself
+        if os.environ.get("PLATFORMIO_DEBUG"):
+            import traceback
+            traceback.print_exc()
         else:
-            raise Exception(
-                "PowerPC EABI VLE toolchain not found.\n\n"
-                "Toolchain Golden Source (v0.0.1):\n"
-                "%s\n\n"
-                "Manual Installation:\n"
-                "1. Download the toolchain from the URL above\n"
-                "2. Extract to a system location (e.g., ~/powerpc-eabivle/ or /opt/powerpc-eabivle/)\n"
-                "3. Set POWERPC_TOOLCHAIN_PATH environment variable to the toolchain directory\n"
-                "   OR ensure bin/powerpc-eabivle-gcc is in your PATH\n\n"
-                "Or install as a PlatformIO package if available in the registry."
-                % TOOLCHAIN_URL
-            )
+            print("  (set PLATFORMIO_DEBUG=1 for the full traceback)")
+    return None
+
+def install_toolchain(package_url, pkg_install_dir, expected_sha256=None):
+    """Download the toolchain archive and extract it into pkg_install_dir."""
+    print("Downloading toolchain from GitHub releases...")
+    print(f"  URL: {package_url}")
+    print(f"  Installing to: {pkg_install_dir}")
+    
+    # Download and extract the toolchain
+    import zipfile
+    import tempfile
+    import shutil
+    
+    try:
+        print("  Downloading archive...")
+        # Small archives stay in memory; larger ones spill to a temp file
+        # that disappears when closed
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE) as spool:
+            archive_sha256 = download_to(package_url, spool)
+            
+            # Verify against the manifest checksum when one is published
+            if expected_sha256 and expected_sha256.lower() != archive_sha256:
+                raise IOError(
+                    "Checksum mismatch for %s: expected %s, got %s"
+                    % (package_url, expected_sha256, archive_sha256)
+                )
+            
+            print("  Extracting archive...")
+            # Extract next to the final location and swap it in,
+            # so a failed extraction never leaves a half-populated package
+            staging_dir = "%s.tmp-%d" % (pkg_install_dir, os.getpid())
+            shutil.rmtree(staging_dir, ignore_errors=True)
+            try:
+                spool.seek(0)
+                with zipfile.ZipFile(spool, 'r') as zip_ref:
+                    extract_zip(zip_ref, staging_dir)
+                shutil.rmtree(pkg_install_dir, ignore_errors=True)
+                os.replace(staging_dir, pkg_install_dir)
+            finally:
+                shutil.rmtree(staging_dir, ignore_errors=True)
+        
+        # Paths probed before the install are stale now
+        _STAT_CACHE.clear()
+        find_toolchain_in_dir.cache_clear()
+        
+        print("Toolchain installed successfully.")
+    except Exception as download_error:
+        # The caller reports the traceback
+        print(f"ERROR: Failed to download/install toolchain: {download_error}")
+        raise
+
+def resolve_system_toolchain():
+    """Toolchain in one of SYSTEM_TOOLCHAIN_PATHS, then anywhere on PATH."""
+    import shutil
+    # One which() scan covers the system locations (in priority order)
+    # followed by the user's PATH
+    search_path = os.pathsep.join(SYSTEM_TOOLCHAIN_PATHS + [os.environ.get("PATH", "")])
+    which_gcc = shutil.which(TOOLCHAIN_TRIPLET + "gcc", path=search_path)
+    if not which_gcc:
+        return None
+    sys_path = os.path.dirname(which_gcc)
+    if sys_path in SYSTEM_TOOLCHAIN_PATHS:
+        print(f"Using system toolchain: {sys_path}")
+        # Use full paths for system toolchain
+        return sys_path, join(sys_path, TOOLCHAIN_TRIPLET)
+    # Found through PATH; tools are invoked by bare name
+    print(f"Using system toolchain from PATH: {which_gcc}")
+    return None, TOOLCHAIN_TRIPLET
+
+TOOLCHAIN_RESOLVERS = (
+    resolve_package_toolchain,
+    resolve_manifest_toolchain,
+    resolve_system_toolchain,
+)
+
+_cached_toolchain = load_toolchain_cache()
+resolved_toolchain = _cached_toolchain
+if not resolved_toolchain:
+    for resolver in TOOLCHAIN_RESOLVERS:
+        resolved_toolchain = resolver()
+        if resolved_toolchain:
+            break
+    else:
+        raise Exception(
+            "PowerPC EABI VLE toolchain not found.\n\n"
+            "Toolchain Golden Source (v0.0.1):\n"
+            "%s\n\n"
+            "Manual Installation:\n"
+            "1. Download the toolchain from the URL above\n"
+            "2. Extract to a system location (e.g., ~/powerpc-eabivle/ or /opt/powerpc-eabivle/)\n"
+            "3. Set POWERPC_TOOLCHAIN_PATH environment variable to the toolchain directory\n"
+            "   OR ensure bin/powerpc-eabivle-gcc is in your PATH\n\n"
+            "Or install as a PlatformIO package if available in the registry."
+            % TOOLCHAIN_URL
+        )
+TOOLCHAIN_DIR, TOOLCHAIN_PREFIX = resolved_toolchain
+
+def toolchain_tool(name):
+    """Command for toolchain executable name (e.g. "gcc") as resolved above."""
+    return TOOLCHAIN_PREFIX + name
+
+if TOOLCHAIN_DIR and not _cached_toolchain:
+    save_toolchain_cache(TOOLCHAIN_DIR, TOOLCHAIN_PREFIX)
 
 # Get board configuration
 board = env.BoardConfig()
 
-# PowerPC VLE machine flags
-machine_flags = [
+# Section size patterns for "size -A" output. PlatformIO compiles and
+# matches these itself, so they stay plain strings
+SIZE_PROG_RE = r"^\.(?:text|data|rodata|vectors)\s+(\d+)"
+SIZE_DATA_RE = r"^\.(?:data|bss|noinit)\s+(\d+)"
+
+# PowerPC VLE machine flags, shared as one immutable tuple. Each flag list
+# below gets the literal flags (not a $VARIABLE reference) so build_unflags
+# can still remove them
+MACHINE_FLAGS = (
     "-meabi",
     "-mhard-float",
     "-mspe",
-    f"-mcpu={board.get('build.cpu', 'e200z4')}"
-]
+    f"-mcpu={board.get('build.cpu', 'e200z4')}",
+)
 
 # Configure toolchain
 # PlatformIO will find tools in the toolchain package's bin directory
 env.Replace(
     # Tool names - PlatformIO will locate them in the toolchain package
-    AR=TOOLCHAIN_PREFIX + "ar",
-    AS=TOOLCHAIN_PREFIX + "as",
-    CC=TOOLCHAIN_PREFIX + "gcc",
-    CXX=TOOLCHAIN_PREFIX + "g++",
-    OBJCOPY=TOOLCHAIN_PREFIX + "objcopy",
-    OBJDUMP=TOOLCHAIN_PREFIX + "objdump",
-    RANLIB=TOOLCHAIN_PREFIX + "ranlib",
-    SIZETOOL=TOOLCHAIN_PREFIX + "size",
+    **{var: toolchain_tool(tool) for var, tool in TOOL_NAMES.items()},
     LINK="$CC",
     
     ARFLAGS=["rc"],
     
     PIODEBUGFLAGS=["-O0", "-g3", "-ggdb", "-gdwarf-2"],
     
-    SIZEPROGREGEXP=r"^(?:\.text|\.data|\.rodata|\.vectors)\s+([0-9]+).*",
-    SIZEDATAREGEXP=r"^(?:\.data|\.bss|\.noinit)\s+(\d+).*",
+    SIZEPROGREGEXP=SIZE_PROG_RE,
+    SIZEDATAREGEXP=SIZE_DATA_RE,
     SIZECHECKCMD="$SIZETOOL -A -d $SOURCES",
     SIZEPRINTCMD='$SIZETOOL -B -d $SOURCES',
     
     PROGSUFFIX=".elf"
 )
 
+# Share compiled objects between projects and branches through PlatformIO's
+# build cache. build_cache_dir in platformio.ini still takes precedence; the
+# POWERPC_BUILD_CACHE_DIR environment variable overrides the default location
+# (e.g. for CI runners that persist ~/.platformio), and an empty value or "0"
+# turns the cache off. SCons never prunes it, so it grows until cleared.
+if not env.subst("$BUILD_CACHE_DIR"):
+    build_cache_dir = os.environ.get("POWERPC_BUILD_CACHE_DIR")
+    if build_cache_dir is None:
+        build_cache_dir = join(env.subst("$PROJECT_CORE_DIR"), ".build_cache")
+    if build_cache_dir not in ("", "0"):
+        os.makedirs(build_cache_dir, exist_ok=True)
+        env.Replace(BUILD_CACHE_DIR=build_cache_dir)
+        # PlatformIO enables the cache before running this script, so do it here
+        env.CacheDir("$BUILD_CACHE_DIR")
+
+# Opt-in ccache/sccache (POWERPC_CCACHE=1). The launcher prefixes the
+# compile commands so CC/CXX stay plain compiler paths for PlatformIO's IDE
+# data and compile_commands.json; linking is never cached. Off by default,
+# since the SCons build cache above already stores every object.
+if os.environ.get("POWERPC_CCACHE") == "1":
+    import shutil
+    compiler_cache = shutil.which("ccache") or shutil.which("sccache")
+    if compiler_cache:
+        env.Replace(
+            COMPILER_CACHE=compiler_cache,
+            CCCOM="$COMPILER_CACHE " + env["CCCOM"],
+            CXXCOM="$COMPILER_CACHE " + env["CXXCOM"],
+        )
+        # CCACHE_DIR is left alone: the user's setting or ccache's default
+        # location keeps one cache shared by every project and board
+        env["ENV"].setdefault("CCACHE_SLOPPINESS", "pch_defines,time_macros")
+
 # Configure build flags
 # Note: Assembly files (.S) will be preprocessed, (.s) will not
 # For .S files, compile through GCC (not direct assembler) to handle @ha/@l relocations
 env.Append(
-    ASFLAGS=machine_flags + [
+    ASFLAGS=[
+        *MACHINE_FLAGS,
         "-Wa,-mvle",  # Enable VLE mode for assembler
         "-Wa,-mrelocatable",  # Enable relocatable code generation for @ha/@l relocations
     ],
     # Preprocessed assembly (.S files) - compile through GCC to handle PowerPC relocations
     # Note: Assembly files may need .vle directive or proper VLE section directives
     # The errors suggest assembler confusion with register indirect addressing
-    ASPPFLAGS=machine_flags + [
+    ASPPFLAGS=[
+        *MACHINE_FLAGS,
         "-x", "assembler-with-cpp",
         "-Wa,-mvle",  # Enable VLE mode for assembler
         "-Wa,-memb",  # Enable embedded ABI mode (may help with VLE instructions)
@@ -303,12 +531,14 @@ env.Append(
         # The linker will handle relocations during final link
     ],
     # Override for .s files (non-preprocessed) - use direct assembler with VLE
-    SFLAGS=machine_flags + [
+    SFLAGS=[
+        *MACHINE_FLAGS,
         "-Wa,-mvle",
         "-Wa,-mrelocatable",
     ],
     
-    CCFLAGS=machine_flags + [
+    CCFLAGS=[
+        *MACHINE_FLAGS,
         "-Os",
         "-ffunction-sections",
         "-fdata-sections",
@@ -326,14 +556,40 @@ env.Append(
         ("F_CPU", board.get("build.f_cpu", "120000000L"))
     ],
     
-    LINKFLAGS=machine_flags + [
+    LINKFLAGS=[
+        *MACHINE_FLAGS,
         "-Os",
         "-Wl,-gc-sections",
     ],
 )
 
+def board_option_enabled(name, default):
+    """Boolean board option; platformio.ini overrides arrive as strings."""
+    value = board.get(name, default)
+    if isinstance(value, str):
+        return value.strip().lower() not in ("0", "false", "no", "off")
+    return bool(value)
+
+# Link-time optimization ("board_build.lto = yes" in platformio.ini) lets
+# -gc-sections drop code that is unused across translation units. Slim LTO
+# objects need the gcc-ar/gcc-ranlib wrappers to build archives. Opt-in, as
+# the bundled GCC 4.9 VLE toolchain predates -flto=auto
+if board_option_enabled("build.lto", False):
+    env.Append(
+        CCFLAGS=["-flto", "-fno-fat-lto-objects"],
+        LINKFLAGS=["-flto"],
+    )
+    env.Replace(
+        AR=toolchain_tool("gcc-ar"),
+        RANLIB=toolchain_tool("gcc-ranlib"),
+    )
+
+# Boards (or "board_build.libs_auto = no" in platformio.ini) can opt out of
+# linking the toolchain's libm/libc, e.g. when the project ships its own libc
+libs_auto = board_option_enabled("build.libs_auto", True)
+
 # Find toolchain library path and add to LIBPATH
-if TOOLCHAIN_DIR:
+if TOOLCHAIN_DIR and libs_auto:
     cpu_variant = board.get('build.cpu', 'e200z4')
     # Try multiple possible library base paths
     # Libraries might be at package root or in subdirectory
@@ -357,9 +613,9 @@ if TOOLCHAIN_DIR:
                 join(lib_base, "e200z6"),  # Fallback
             ])
     
+    # Candidates are built from TOOLCHAIN_DIR and contain no SCons variables
     for lib_path in potential_lib_paths:
-        expanded_lib_path = env.subst(lib_path)
-        if exists(expanded_lib_path):
+        if _cached_exists(lib_path):
             env.Append(LIBPATH=[lib_path])
             env.Append(LIBS=["m", "c"])
             break
@@ -376,19 +632,31 @@ if env.get("PROGNAME", "program") == "program":
 # 4. Board-specific default linker script from platform/linker/
 # 5. No linker script (user must provide)
 
+# MCU family substring -> shared series linker script prefix (checked in order)
+LINKER_SERIES = {
+    "574": "57xx",
+    "564": "56xx",
+    "577": "57xx",
+}
+
 def find_linker_script():
     """Find appropriate linker script with fallback hierarchy."""
-    board_mcu = board.get("build.mcu", "").lower()
-    
     # Check if user already specified a linker script in build_flags
     # Look in both BUILD_FLAGS and LINKFLAGS
-    for flag_list_name in ["BUILD_FLAGS", "LINKFLAGS"]:
-        flags = env.get(flag_list_name, [])
-        for flag in flags:
-            flag_str = str(flag) if not isinstance(flag, str) else flag
-            if "-T" in flag_str:
-                # User has specified linker script
-                return None
+    flag_lists = []
+    for flags in (env.get("BUILD_FLAGS", []), env.get("LINKFLAGS", [])):
+        if isinstance(flags, str):
+            import shlex
+            flags = shlex.split(flags)
+        flag_lists.append(flags)
+    if any(
+        flag.startswith(("-T", "-Wl,-T"))
+        for flags in flag_lists
+        for flag in flags
+        if isinstance(flag, str)
+    ):
+        # User has specified linker script
+        return None
     
     # Check board configuration for linker script
     # Handle missing option gracefully (some boards don't have this field)
@@ -399,51 +667,48 @@ def find_linker_script():
     
     if board_linker:
         # Can be relative to platform or absolute
-        if exists(env.subst(board_linker)):
+        board_linker_path = env.subst(board_linker)
+        if _cached_exists(board_linker_path):
             return board_linker
         # Try relative to platform
-        platform_linker = join(platform.get_dir(), "linker", board_linker)
-        if exists(env.subst(platform_linker)):
+        platform_linker = join(PLATFORM_DIR, "linker", board_linker_path)
+        if _cached_exists(platform_linker):
             return platform_linker
     
     # Check for project-level linker.ld
-    project_linker = join("$PROJECT_DIR", "linker.ld")
-    if exists(env.subst(project_linker)):
+    project_linker = join(PROJECT_DIR, "linker.ld")
+    if _cached_exists(project_linker):
         return project_linker
     
-    # Check for board-specific linker script in platform
-    platform_dir = platform.get_dir()
-    
+    # Board values are only needed once the cheaper checks above have failed
+    board_mcu = board.get("build.mcu", "").lower()
     # Get linker type from board config (default: flash)
     linker_type = board.get("build.linker_type", "flash")  # flash or ram
     
-    # Try board-specific variants first
-    linker_variants = [
+    # Board-specific variants first, then series-based fallbacks
+    linker_variants = (
         f"{board_mcu}_{linker_type}.ld",  # e.g., mpc5748g_flash.ld
         f"{board_mcu}.ld",                # e.g., mpc5748g.ld
-    ]
+    )
+    series = next(
+        (name for key, name in LINKER_SERIES.items() if key in board_mcu), None
+    )
+    if series:
+        linker_variants += (
+            f"{series}_{linker_type}.ld",  # e.g., 57xx_flash.ld
+            f"{series}_flash.ld",          # Always try flash as fallback
+        )
     
-    # Add series-based fallbacks
-    if "574" in board_mcu:
-        linker_variants.extend([
-            f"57xx_{linker_type}.ld",     # e.g., 57xx_flash.ld
-            "57xx_flash.ld",              # Always try flash as fallback
-        ])
-    elif "564" in board_mcu:
-        linker_variants.extend([
-            f"56xx_{linker_type}.ld",     # e.g., 56xx_flash.ld
-            "56xx_flash.ld",              # Always try flash as fallback
-        ])
-    elif "577" in board_mcu:
-        linker_variants.extend([
-            f"57xx_{linker_type}.ld",
-            "57xx_flash.ld",
-        ])
+    # One directory listing instead of a stat per candidate
+    linker_dir = join(PLATFORM_DIR, "linker")
+    try:
+        available = frozenset(os.listdir(linker_dir))
+    except OSError:
+        available = frozenset()
     
     for variant in linker_variants:
-        platform_linker = join(platform_dir, "linker", variant)
-        if exists(env.subst(platform_linker)):
-            return platform_linker
+        if variant in available:
+            return join(linker_dir, variant)
     
     return None
 
@@ -451,30 +716,32 @@ def find_linker_script():
 linker_script = find_linker_script()
 if linker_script:
     # Use proper SCons substitution and avoid extra spaces in path
-    linker_flag = f"-T{env.subst(linker_script)}"
-    env.Append(LINKFLAGS=[linker_flag])
-    print(f"Using linker script: {env.subst(linker_script)}")
+    linker_script_path = env.subst(linker_script)
+    env.Append(LINKFLAGS=[f"-T{linker_script_path}"])
+    print(f"Using linker script: {linker_script_path}")
 
 # Create builders for binary output formats
 
 env.Append(
     BUILDERS=dict(
         ElfToBin=Builder(
-            action=env.VerboseAction(" ".join([
+            # A nested list is a single command with pre-split arguments
+            action=env.VerboseAction([[
                 "$OBJCOPY",
                 "-O", "binary",
                 "$SOURCES",
                 "$TARGET"
-            ]), "Building binary $TARGET"),
+            ]], "Building binary $TARGET"),
             suffix=".bin"
         ),
         ElfToHex=Builder(
-            action=env.VerboseAction(" ".join([
+            # A nested list is a single command with pre-split arguments
+            action=env.VerboseAction([[
                 "$OBJCOPY",
                 "-O", "ihex",
                 "$SOURCES",
                 "$TARGET"
-            ]), "Building hex $TARGET"),
+            ]], "Building hex $TARGET"),
             suffix=".hex"
         )
     )
@@ -6,16 +6,40 @@ This script searches for a toolchain zip file in common locations and updates
 package.json to use a file:// URL if found.
 """
 
+from fnmatch import fnmatchcase
 from pathlib import Path
 import json
+import os
 import sys
-from typing import Optional
+from typing import List, Optional
+
+
+TOOLCHAIN_ZIP_NAME = "gcc-4.9.4-Ee200-eabivle-x86_64-linux-g2724867.zip"
+
+# Recursive search patterns, best match first
+TOOLCHAIN_ZIP_PATTERNS = (TOOLCHAIN_ZIP_NAME, "*powerpc*.zip", "*eabivle*.zip")
+
+
+def search_tree(root: Path) -> List[Optional[Path]]:
+    """
+    Find the first file below root matching each of TOOLCHAIN_ZIP_PATTERNS.
+
+    One os.walk serves every pattern, and the walk stops as soon as the
+    exact toolchain file name turns up.
+    """
+    matches: List[Optional[Path]] = [None] * len(TOOLCHAIN_ZIP_PATTERNS)
+    for dirpath, _, filenames in os.walk(root):
+        for name in filenames:
+            for index, pattern in enumerate(TOOLCHAIN_ZIP_PATTERNS):
+                if matches[index] is None and fnmatchcase(name, pattern):
+                    matches[index] = Path(dirpath) / name
+        if matches[0] is not None:
+            break
+    return matches
 
 
 def find_toolchain_zip() -> Optional[Path]:
     """Find toolchain zip file in common locations."""
-    import os
-    
     # Get current working directory and home directory
     cwd = Path.cwd()
     home = Path.home()
@@ -27,28 +51,41 @@ def find_toolchain_zip() -> Optional[Path]:
     else:
         project_dir = cwd
     
+    platform_root = Path(__file__).parent.parent.parent.parent
     search_paths = [
         # In the toolchain package directory
-        Path(__file__).parent / "toolchain" / "gcc-4.9.4-Ee200-eabivle-x86_64-linux-g2724867.zip",
-        Path(__file__).parent.parent.parent.parent / "toolchain" / "gcc-4.9.4-Ee200-eabivle-x86_64-linux-g2724867.zip",
+        Path(__file__).parent / "toolchain" / TOOLCHAIN_ZIP_NAME,
+        platform_root / "toolchain" / TOOLCHAIN_ZIP_NAME,
         # In platform root
-        Path(__file__).parent.parent.parent.parent / "gcc-4.9.4-Ee200-eabivle-x86_64-linux-g2724867.zip",
+        platform_root / TOOLCHAIN_ZIP_NAME,
         # In current working directory or project directory
-        cwd / "gcc-4.9.4-Ee200-eabivle-x86_64-linux-g2724867.zip",
-        project_dir / "gcc-4.9.4-Ee200-eabivle-x86_64-linux-g2724867.zip",
+        cwd / TOOLCHAIN_ZIP_NAME,
+        project_dir / TOOLCHAIN_ZIP_NAME,
         # In home directory
-        home / "gcc-4.9.4-Ee200-eabivle-x86_64-linux-g2724867.zip",
-        # Generic search by pattern in current directory and project directory
-        *list(cwd.glob("**/gcc-4.9.4-Ee200-eabivle-x86_64-linux-g2724867.zip")),
-        *list(project_dir.glob("**/gcc-4.9.4-Ee200-eabivle-x86_64-linux-g2724867.zip")),
-        *list(cwd.glob("**/*powerpc*.zip")),
-        *list(cwd.glob("**/*eabivle*.zip")),
-        *list(project_dir.glob("**/*powerpc*.zip")),
-        *list(project_dir.glob("**/*eabivle*.zip")),
+        home / TOOLCHAIN_ZIP_NAME,
     ]
     
+    # Fixed locations first; is_file() is False for missing paths
     for path in search_paths:
-        if path.exists() and path.is_file():
+        if path.is_file():
+            return path.resolve()
+    
+    # Generic search by pattern in current directory and project directory,
+    # walking each tree at most once. The project tree is skipped when the
+    # current directory already holds the exact file name
+    cwd_matches = search_tree(cwd)
+    if cwd_matches[0] is not None:
+        return cwd_matches[0].resolve()
+    if project_dir.resolve() == cwd.resolve():
+        project_matches = cwd_matches
+    else:
+        project_matches = search_tree(project_dir)
+    
+    # Same precedence as before: exact name anywhere, then cwd patterns,
+    # then project directory patterns
+    candidates = [project_matches[0], *cwd_matches[1:], *project_matches[1:]]
+    for path in candidates:
+        if path is not None:
             return path.resolve()
     
     return None
@@ -7,37 +7,69 @@ boards using various upload methods (OpenSDA, J-Link, etc.).
 
 The implementation is currently a skeleton for future development.
 
-Attributes
-----------
-PROJECT_ROOT : Path
-    Root directory of the repository
-EXAMPLES_DIR : Path
-    Directory containing PlatformIO example projects
-VENV_PIO : Path
-    Path to PlatformIO executable in virtual environment
+The repository root, examples directory and virtual environment
+PlatformIO executable are available from ``project_root()``,
+``examples_dir()`` and ``venv_pio()``. They are resolved on first use
+rather than at import time.
 """
 
 import argparse
 import configparser
+import functools
 import logging
+import os
+import queue
+import re
 import subprocess
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Logging is configured in main(); library callers keep their own setup
 logger = logging.getLogger(__name__)
 
+
 # Use environment variable or absolute path resolution
 # Do not use relative paths
-import os
-PROJECT_ROOT = Path(os.environ.get("PLATFORMIO_WORKSPACE", os.getcwd())).resolve()
-EXAMPLES_DIR = PROJECT_ROOT / "platform-nxppowerpc-examples"
-VENV_PIO = PROJECT_ROOT / "venv" / "bin" / "pio"
+@functools.cache
+def project_root() -> Path:
+    """
+    Root directory of the repository.
+
+    Returns
+    -------
+    Path
+        PLATFORMIO_WORKSPACE, or the current directory, resolved to an
+        absolute path
+    """
+    return Path(os.environ.get("PLATFORMIO_WORKSPACE", os.getcwd())).resolve()
+
+
+@functools.cache
+def examples_dir() -> Path:
+    """
+    Directory containing PlatformIO example projects.
+
+    Returns
+    -------
+    Path
+        platform-nxppowerpc-examples below ``project_root()``
+    """
+    return project_root() / "platform-nxppowerpc-examples"
+
+
+@functools.cache
+def venv_pio() -> Path:
+    """
+    Path to PlatformIO executable in virtual environment.
+
+    Returns
+    -------
+    Path
+        venv/bin/pio below ``project_root()``
+    """
+    return project_root() / "venv" / "bin" / "pio"
 
 
 class UploadMethod:
@@ -59,6 +91,139 @@ class UploadMethod:
     CUSTOM = "custom"
 
 
+# Inline comments start at ';' or '#' preceded by whitespace, as in
+# PlatformIO (so URLs like "...git#v0.1.0" keep their fragment)
+_INLINE_COMMENT_RE = re.compile(r"\s[;#]")
+
+# Keys are separated from values by the first '=' or ':', as in ConfigParser
+_OPTION_RE = re.compile(r"([^=:]*)([=:])(.*)")
+
+EnvInfo = Tuple[str, Optional[str], Optional[str], Optional[str]]
+
+
+def _scan_first_env(ini_path: str) -> Optional[EnvInfo]:
+    """
+    Read the first environment section with a single line-by-line pass.
+
+    Parameters
+    ----------
+    ini_path : str
+        Path to platformio.ini
+
+    Returns
+    -------
+    Optional[EnvInfo]
+        Environment name, board, platform and framework, or None if the
+        file has no environment sections
+    """
+    environment = None
+    values: Dict[str, Optional[str]] = {}
+    with open(ini_path, "r", encoding="utf-8") as f:
+        for line in f:
+            # Continuation lines of multi-line values (e.g. build_flags)
+            if line[:1].isspace():
+                continue
+            line = _INLINE_COMMENT_RE.split(line, 1)[0].strip()
+            if not line or line[0] in ";#":
+                continue
+            if line.startswith("["):
+                if environment is not None:
+                    break
+                name = line[1:line.find("]")]
+                if name.startswith("env:"):
+                    environment = name[4:]
+                continue
+            if environment is None:
+                continue
+            match = _OPTION_RE.match(line)
+            key = (match.group(1) if match else line).strip().lower()
+            if key in ("board", "platform", "framework"):
+                values[key] = match.group(3).strip() if match else None
+
+    if environment is None:
+        return None
+    return (
+        environment,
+        values.get("board"),
+        values.get("platform"),
+        values.get("framework"),
+    )
+
+
+def _parse_first_env(ini_path: str) -> Optional[EnvInfo]:
+    """
+    Read the first environment section with ConfigParser.
+
+    Parameters
+    ----------
+    ini_path : str
+        Path to platformio.ini
+
+    Returns
+    -------
+    Optional[EnvInfo]
+        Environment name, board, platform and framework, or None if the
+        file has no environment sections
+    """
+    config = configparser.ConfigParser(
+        allow_no_value=True,
+        interpolation=None,
+        inline_comment_prefixes=(";", "#")
+    )
+    config.read(ini_path, encoding="utf-8")
+
+    for section_name in config.sections():
+        if section_name.startswith("env:"):
+            section = config[section_name]
+            return (
+                section_name[4:],
+                section.get("board", None),
+                section.get("platform", None),
+                section.get("framework", None),
+            )
+    return None
+
+
+@functools.lru_cache(maxsize=64)
+def _read_first_env(
+    ini_path: str,
+    mtime_ns: int,
+    size: int
+) -> Optional[EnvInfo]:
+    """
+    Return the first environment section of platformio.ini.
+
+    Memoized on the file's modification time and size (which callers pass
+    in from ``os.stat``), so an unchanged file is parsed only once. Only
+    three keys of the first [env:...] section are needed, so the file is
+    scanned directly; ConfigParser is the fallback when the scan fails or
+    finds no board.
+
+    Parameters
+    ----------
+    ini_path : str
+        Path to platformio.ini
+    mtime_ns : int
+        Modification time of the file in nanoseconds
+    size : int
+        Size of the file in bytes
+
+    Returns
+    -------
+    Optional[EnvInfo]
+        Environment name, board, platform and framework, or None if the
+        file has no environment sections
+    """
+    try:
+        env = _scan_first_env(ini_path)
+    except (OSError, UnicodeDecodeError) as e:
+        logger.debug("Falling back to ConfigParser for %s: %s", ini_path, e)
+        env = None
+    if env is not None and env[1]:
+        return env
+    return _parse_first_env(ini_path)
+
+
 def detect_board_from_ini(project_path: Path) -> Optional[Dict[str, str]]:
     """
     Detect board configuration from platformio.ini file.
@@ -74,33 +239,31 @@ def detect_board_from_ini(project_path: Path) -> Optional[Dict[str, str]]:
         Dictionary with board, platform, and framework information,
         or None if not found
     """
-    ini_path = project_path / "platformio.ini"
-    if not ini_path.exists():
-        logger.error(f"platformio.ini not found in {project_path}")
+    ini_path = os.path.join(project_path, "platformio.ini")
+    try:
+        st = os.stat(ini_path)
+    except FileNotFoundError:
+        logger.error("platformio.ini not found in %s", project_path)
         return None
 
     try:
-        config = configparser.ConfigParser(allow_no_value=True)
-        config.read(ini_path)
-
-        # Get first environment (or could iterate through all)
-        for section_name in config.sections():
-            if section_name.startswith("env:"):
-                section = config[section_name]
-                return {
-                    "board": section.get("board", None),
-                    "platform": section.get("platform", None),
-                    "framework": section.get("framework", None),
-                    "environment": section_name[4:]
-                }
-
-        logger.warning(f"No environment sections found in {ini_path}")
+        env = _read_first_env(ini_path, st.st_mtime_ns, st.st_size)
+    except Exception as e:
+        logger.error("Failed to parse %s: %s", ini_path, e)
         return None
 
-    except Exception as e:
-        logger.error(f"Failed to parse {ini_path}: {e}")
+    if env is None:
+        logger.warning("No environment sections found in %s", ini_path)
         return None
 
+    environment, board, platform, framework = env
+    return {
+        "board": board,
+        "platform": platform,
+        "framework": framework,
+        "environment": environment
+    }
+
 
 def locate_firmware(project_path: Path, env_name: str) -> Optional[Path]:
     """
@@ -118,19 +281,18 @@ def locate_firmware(project_path: Path, env_name: str) -> Optional[Path]:
     Optional[Path]
         Path to firmware.elf or firmware.bin, or None if not found
     """
-    # Check for firmware.elf (preferred)
-    firmware_elf = project_path / ".pio" / "build" / env_name / "firmware.elf"
-    if firmware_elf.exists():
-        return firmware_elf
+    # Plain string joins; a Path is only built for the result
+    build_dir = os.path.join(project_path, ".pio", "build", env_name)
 
-    # Check for firmware.bin
-    firmware_bin = project_path / ".pio" / "build" / env_name / "firmware.bin"
-    if firmware_bin.exists():
-        return firmware_bin
+    # Check for firmware.elf (preferred), then firmware.bin
+    for name in ("firmware.elf", "firmware.bin"):
+        firmware = os.path.join(build_dir, name)
+        if os.path.isfile(firmware):
+            return Path(firmware)
 
     logger.error(
-        f"Firmware not found for {project_path} [{env_name}]. "
-        f"Run 'pio run -e {env_name}' first."
+        "Firmware not found for %s [%s]. Run 'pio run -e %s' first.",
+        project_path, env_name, env_name
     )
     return None
 
@@ -167,7 +329,7 @@ def upload_opensda(
     - P&E Micro GDB Server
     - See platform-nxppowerpc/docs/OPENSDA_FLASHER_ANALYSIS.md
     """
-    logger.info(f"Uploading via OpenSDA: {firmware_path} to {board}")
+    logger.info("Uploading via OpenSDA: %s to %s", firmware_path, board)
     logger.warning("OpenSDA upload not yet implemented")
     logger.info("See platform-nxppowerpc/docs/OPENSDA_FLASHER_ANALYSIS.md for details")
     return False
@@ -198,7 +360,7 @@ def upload_jlink(
     - SEGGER J-Link software installed
     - J-Link hardware connected
     """
-    logger.info(f"Uploading via J-Link: {firmware_path} to {board}")
+    logger.info("Uploading via J-Link: %s to %s", firmware_path, board)
     logger.warning("J-Link upload not yet implemented")
     return False
 
@@ -225,64 +387,85 @@ def upload_custom(
     bool
         True if upload succeeded, False otherwise
     """
-    logger.info(f"Uploading via custom script: {firmware_path} to {board}")
+    logger.info("Uploading via custom script: %s to %s", firmware_path, board)
     logger.warning("Custom uploader not yet implemented")
     return False
 
 
-def upload_firmware(
+def resolve_upload_target(
     project_path: Path,
-    method: str = UploadMethod.OPENSDA,
     env_name: Optional[str] = None,
-    firmware_path: Optional[Path] = None,
-    **kwargs
-) -> bool:
+    firmware_path: Optional[Path] = None
+) -> Optional[Tuple[Path, str]]:
     """
-    Upload firmware to a board.
+    Resolve the firmware file and board name for a project environment.
 
     Parameters
     ----------
     project_path : Path
         Path to the PlatformIO project directory
-    method : str, optional
-        Upload method to use, by default UploadMethod.OPENSDA
     env_name : Optional[str], optional
         Environment name. If not provided, will use first environment
         from platformio.ini, by default None
     firmware_path : Optional[Path], optional
         Path to firmware file. If not provided, will auto-detect,
         by default None
-    **kwargs
-        Additional arguments for upload methods
 
     Returns
     -------
-    bool
-        True if upload succeeded, False otherwise
+    Optional[Tuple[Path, str]]
+        Firmware path and board name, or None if either cannot be found
     """
     # Detect board configuration
     board_config = detect_board_from_ini(project_path)
     if not board_config:
-        return False
+        return None
 
     if env_name is None:
         env_name = board_config.get("environment")
         if not env_name:
             logger.error("No environment specified and could not detect from ini")
-            return False
+            return None
 
     # Locate firmware if not provided
     if firmware_path is None:
         firmware_path = locate_firmware(project_path, env_name)
         if not firmware_path:
-            return False
+            return None
 
     board = board_config.get("board")
     if not board:
         logger.error("Board name not found in configuration")
-        return False
+        return None
 
-    # Dispatch to appropriate upload method
+    return firmware_path, board
+
+
+def dispatch_upload(
+    firmware_path: Path,
+    board: str,
+    method: str = UploadMethod.OPENSDA,
+    **kwargs
+) -> bool:
+    """
+    Upload a resolved firmware file with the given method.
+
+    Parameters
+    ----------
+    firmware_path : Path
+        Path to the firmware file to upload
+    board : str
+        Board name (e.g., 'mpc5748g')
+    method : str, optional
+        Upload method to use, by default UploadMethod.OPENSDA
+    **kwargs
+        Additional arguments for upload methods
+
+    Returns
+    -------
+    bool
+        True if upload succeeded, False otherwise
+    """
     if method == UploadMethod.OPENSDA:
         return upload_opensda(firmware_path, board, **kwargs)
     elif method == UploadMethod.JLINK:
@@ -294,18 +477,130 @@ def upload_firmware(
             return False
         return upload_custom(firmware_path, board, Path(uploader_script))
     else:
-        logger.error(f"Unknown upload method: {method}")
+        logger.error("Unknown upload method: %s", method)
         return False
 
 
-def main() -> int:
+def upload_firmware(
+    project_path: Path,
+    method: str = UploadMethod.OPENSDA,
+    env_name: Optional[str] = None,
+    firmware_path: Optional[Path] = None,
+    **kwargs
+) -> bool:
     """
-    Main entry point for the firmware upload script.
+    Upload firmware to a board.
+
+    Parameters
+    ----------
+    project_path : Path
+        Path to the PlatformIO project directory
+    method : str, optional
+        Upload method to use, by default UploadMethod.OPENSDA
+    env_name : Optional[str], optional
+        Environment name. If not provided, will use first environment
+        from platformio.ini, by default None
+    firmware_path : Optional[Path], optional
+        Path to firmware file. If not provided, will auto-detect,
+        by default None
+    **kwargs
+        Additional arguments for upload methods
 
     Returns
     -------
-    int
-        Exit code: 0 if upload succeeded, 1 if failed
+    bool
+        True if upload succeeded, False otherwise
+    """
+    target = resolve_upload_target(project_path, env_name, firmware_path)
+    if target is None:
+        return False
+
+    firmware_path, board = target
+    # Dispatch to appropriate upload method
+    return dispatch_upload(firmware_path, board, method, **kwargs)
+
+
+def upload_firmware_batch(
+    jobs: List[Tuple[Path, Optional[str]]],
+    method: str = UploadMethod.OPENSDA,
+    ports: Optional[List[int]] = None,
+    **kwargs
+) -> bool:
+    """
+    Upload firmware for several projects in one invocation.
+
+    Every project is resolved before the first upload starts, so a missing
+    platformio.ini or firmware aborts the batch before any board is
+    touched. Resolving shares the platformio.ini cache, so projects that
+    appear more than once are parsed a single time.
+
+    Parameters
+    ----------
+    jobs : List[Tuple[Path, Optional[str]]]
+        Project directory and environment name (None for the first
+        environment from platformio.ini) for each upload
+    method : str, optional
+        Upload method to use, by default UploadMethod.OPENSDA
+    ports : Optional[List[int]], optional
+        GDB server ports, one per connected OpenSDA probe. With more than
+        one port, uploads run in parallel and each probe flashes one board
+        at a time, by default None
+    **kwargs
+        Additional arguments for upload methods
+
+    Returns
+    -------
+    bool
+        True if every upload succeeded, False otherwise
+    """
+    if ports and method != UploadMethod.OPENSDA:
+        logger.error("Probe ports are only supported for %s uploads", UploadMethod.OPENSDA)
+        return False
+
+    targets = []
+    for project_path, env_name in jobs:
+        target = resolve_upload_target(project_path, env_name)
+        if target is None:
+            return False
+        targets.append(target)
+
+    if not ports:
+        success = True
+        for firmware_path, board in targets:
+            if not dispatch_upload(firmware_path, board, method, **kwargs):
+                success = False
+        return success
+
+    # Each worker borrows a free probe port for the duration of one upload
+    kwargs.pop("port", None)
+    free_ports: "queue.Queue[int]" = queue.Queue()
+    for port in ports:
+        free_ports.put(port)
+
+    def upload_on_free_probe(target: Tuple[Path, str]) -> bool:
+        port = free_ports.get()
+        try:
+            return dispatch_upload(*target, method, port=port, **kwargs)
+        finally:
+            free_ports.put(port)
+
+    with ThreadPoolExecutor(max_workers=len(ports)) as pool:
+        results = list(pool.map(upload_on_free_probe, targets))
+    return all(results)
+
+
+@functools.cache
+def _build_parser() -> argparse.ArgumentParser:
+    """
+    Build the command-line parser, once per process.
+
+    Programmatic callers should use ``upload_firmware`` or
+    ``upload_firmware_batch`` directly instead of going through the CLI.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        Parser for the upload script arguments
     """
     parser = argparse.ArgumentParser(
         description="Upload firmware to PowerPC boards"
@@ -313,7 +608,8 @@ def main() -> int:
     parser.add_argument(
         "project_path",
         type=Path,
-        help="Path to PlatformIO project directory"
+        nargs="+",
+        help="Path to PlatformIO project directory (several with --batch)"
     )
     parser.add_argument(
         "-m", "--method",
@@ -337,13 +633,61 @@ def main() -> int:
         default=7224,
         help="GDB server port for OpenSDA (default: 7224)"
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Upload every given project in one run; all are resolved before the first upload"
+    )
+    parser.add_argument(
+        "--probe-port",
+        dest="probe_ports",
+        type=int,
+        action="append",
+        metavar="PORT",
+        help="With --batch, GDB server port of one OpenSDA probe; repeat to flash in parallel"
+    )
     parser.add_argument(
         "--uploader-script",
         type=Path,
         help="Path to custom uploader script (required for custom method)"
     )
+    parser.add_argument(
+        "-v", "--verbose",
+        action="store_true",
+        help="Enable debug output with timestamps"
+    )
+
+    return parser
+
 
+def main() -> int:
+    """
+    Main entry point for the firmware upload script.
+
+    Returns
+    -------
+    int
+        Exit code: 0 if upload succeeded, 1 if failed
+    """
+    parser = _build_parser()
     args = parser.parse_args()
+    if not args.batch:
+        if len(args.project_path) > 1:
+            parser.error("several project paths require --batch")
+        if args.probe_ports:
+            parser.error("--probe-port requires --batch")
+    elif args.firmware:
+        parser.error("--firmware cannot be combined with --batch")
+
+    # Timestamps cost a localtime()/strftime() per record; only add them
+    # for verbose runs
+    if args.verbose:
+        logging.basicConfig(
+            level=logging.DEBUG,
+            format='%(asctime)s - %(levelname)s - %(message)s'
+        )
+    else:
+        logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
 
     kwargs = {}
     if args.port:
@@ -351,8 +695,17 @@ def main() -> int:
     if args.uploader_script:
         kwargs["uploader_script"] = args.uploader_script
 
+    if args.batch:
+        success = upload_firmware_batch(
+            [(project_path, args.env) for project_path in args.project_path],
+            method=args.method,
+            ports=args.probe_ports,
+            **kwargs
+        )
+        return 0 if success else 1
+
     success = upload_firmware(
-        project_path=args.project_path,
+        project_path=args.project_path[0],
         method=args.method,
         env_name=args.env,
         firmware_path=args.firmware,